@@ -1,18 +1,107 @@
 """
 FastAPI Backend for Student Performance System
 """
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import pickle
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+import json
+import os
+import sys
+import threading
 import numpy as np
 import pandas as pd
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.store import StudentStore, STORE_FILE, CSV_FILE, store_exists, load_students
+from core.ingest import ingest
+from core.scoring import score_cohort
+from core.cascade import cascade_batches, summarize_reports, CASCADE_BATCH
+from core.voting import VOTING_MODES
+from core.compact import CompactForest, compact_path
+from core.schema import SchemaError, check
+from core.columnar import JSON, MEDIA_TYPES, BINARY_TYPES, negotiate, media_type, read_frame, write_frame
+from core.history import SnapshotStore, HISTORY_DIR
+from core.tenants import (TenantRegistry, UnknownTenant, DEFAULT_TENANT, TENANT_CACHE_MB,
+                          load_models)
+
 app = FastAPI(title="Student Performance API")
 
-# Load models
-with open('../models/graduation_model.pkl','rb') as f: grad_model = pickle.load(f)
-with open('../models/risk_model.pkl','rb') as f: risk_model = pickle.load(f)
-with open('../models/feature_names.pkl','rb') as f: features = pickle.load(f)
+MODEL_FILES = {
+    'grad': 'models/graduation_model.pkl',
+    'risk': 'models/risk_model.pkl',
+    'place': 'models/placement_model.pkl',
+    'package': 'models/package_model.pkl',
+    'le_grad': 'models/le_graduation.pkl',
+    'le_place': 'models/le_placement.pkl',
+    'features': 'models/feature_names.pkl',
+}
+
+# Serve the float32/int16 forests exported by phase 2 instead of the pickles
+COMPACT_MODELS = os.environ.get('COMPACT_MODELS', '0') == '1'
+COMPACT_KEYS = ('grad', 'risk', 'place', 'package')
+
+# Models are loaded per tenant on first use and kept in a memory-bounded LRU
+def load_tenant(tenant_id, base):
+    compact = {}
+    if COMPACT_MODELS:
+        compact = {key: compact_path(key, base) for key in COMPACT_KEYS
+                   if os.path.exists(compact_path(key, base))}
+    files = {key: path for key, path in MODEL_FILES.items() if key not in compact}
+    models = load_models(base, files)
+    models.update({key: CompactForest.load(path) for key, path in compact.items()})
+    paths = [os.path.join(base, p) for p in files.values()] + list(compact.values())
+    return models, sum(os.path.getsize(p) for p in paths)
+
+registry = TenantRegistry(load_tenant, root=ROOT,
+                          max_bytes=int(os.environ.get('TENANT_CACHE_MB', TENANT_CACHE_MB)) * 1024**2)
+
+def get_models(tenant_id):
+    try:
+        return registry.get(tenant_id)
+    except UnknownTenant:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+
+# One indexed store connection per tenant directory
+stores = {}
+stores_lock = threading.Lock()
+
+def get_base(tenant_id):
+    try:
+        return registry.base_dir(tenant_id)
+    except UnknownTenant:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+
+# A checkout ships only the CSV: the store is built from it on first use
+def get_store(tenant_id):
+    base = get_base(tenant_id)
+    with stores_lock:
+        if base not in stores:
+            exists = store_exists(base)
+            if not exists and not os.path.exists(os.path.join(base, CSV_FILE)):
+                raise HTTPException(status_code=503, detail="No student data - run phase 1 first")
+            store = StudentStore(os.path.join(base, STORE_FILE))
+            if not exists:
+                store.write(load_students(base))
+            stores[base] = store
+    return stores[base]
+
+# Invalid values are rejected with the failing rows, columns and reasons
+def check_records(df):
+    try:
+        check(df)
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail=e.report.summary())
+
+def parse_fields(fields):
+    return [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+def records(df):
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+class StudentRecords(BaseModel):
+    records: list[dict]
 
 class StudentData(BaseModel):
     overall_cgpa: float
@@ -27,18 +116,186 @@ def read_root():
 
 @app.post("/predict")
 def predict(data: StudentData):
-    X = np.zeros(len(features))
+    return predict_for_tenant(DEFAULT_TENANT, data)
+
+@app.post("/tenants/{tenant_id}/predict")
+def predict_for_tenant(tenant_id: str, data: StudentData):
+    check_records(pd.DataFrame([data.model_dump()]))
+    models = get_models(tenant_id)
+    X = np.zeros(len(models['features']))
     X[0] = data.overall_cgpa
     X[1] = data.overall_attendance
     X[2] = data.current_backlogs
     
-    risk = risk_model.predict(X.reshape(1,-1))[0]
+    risk = models['risk'].predict(X.reshape(1,-1))[0]
     
     return {
         "risk_score": float(risk),
         "status": "Critical" if risk>70 else "High" if risk>50 else "Medium" if risk>30 else "Low"
     }
 
+@app.post("/predict/batch")
+async def predict_batch(request: Request, voting: str = 'exact'):
+    return await predict_batch_for_tenant(DEFAULT_TENANT, request, voting)
+
+@app.post("/tenants/{tenant_id}/predict/batch")
+async def predict_batch_for_tenant(tenant_id: str, request: Request, voting: str = 'exact'):
+    """
+    Graduation, risk, placement and package for a batch of student records
+    through the cascade; the package model only runs for predicted placements.
+    `voting=safe` or `voting=confident` lets the graduation forest stop early.
+
+    The body is `{"records": [...]}` as JSON, or one array per column as
+    application/x-npz or an Arrow IPC stream (Content-Type). The Accept
+    header picks the response format; binary responses carry the
+    predictions table and put the batch report in X-Cascade-Report.
+    """
+    accept = negotiate(request.headers.get('accept'))
+    if accept is None:
+        raise HTTPException(status_code=406, detail=f"Accept one of: {', '.join(MEDIA_TYPES)}")
+    kind = media_type(request.headers.get('content-type')) or JSON
+    body = await request.body()
+    try:
+        if kind == JSON:
+            students = pd.DataFrame(StudentRecords.model_validate_json(body).records)
+        elif kind in BINARY_TYPES:
+            students = read_frame(body, kind)
+        else:
+            raise HTTPException(status_code=415, detail=f"Content-Type must be one of: {', '.join(MEDIA_TYPES)}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_in_threadpool(score_batch, tenant_id, students, voting, accept)
+
+def score_batch(tenant_id, students, voting, accept):
+    if voting not in VOTING_MODES:
+        raise HTTPException(status_code=400, detail=f"voting must be one of: {', '.join(VOTING_MODES)}")
+    models = get_models(tenant_id)
+    if voting != 'exact' and isinstance(models['grad'], CompactForest):
+        raise HTTPException(status_code=400, detail="Early-exit voting needs the full graduation model (COMPACT_MODELS=0)")
+    if students.empty:
+        raise HTTPException(status_code=400, detail="No records")
+    check_records(students)
+    if 'student_id' not in students.columns:
+        students['student_id'] = [str(i) for i in range(len(students))]
+    parts, reports = [], []
+    for predictions, report in cascade_batches(students, models, CASCADE_BATCH, voting=voting):
+        parts.append(predictions)
+        reports.append(report)
+    batches = [{'rows': r['rows'], 'saved': r['saved'], 'seconds': r['seconds'],
+                'stage_rows': {name: stage['rows'] for name, stage in r['stages'].items()}} for r in reports]
+    predictions = pd.concat(parts)
+    if accept != JSON:
+        report = json.dumps({"batches": batches, "cost": summarize_reports(reports)})
+        return Response(write_frame(predictions, accept), media_type=accept,
+                        headers={'X-Cascade-Report': report})
+    return {"predictions": records(predictions), "batches": batches, "cost": summarize_reports(reports)}
+
 @app.get("/health")
 def health():
     return {"status": "healthy", "models_loaded": True}
+
+@app.get("/students/{student_id}")
+def get_student(student_id: str, fields: str = None):
+    return get_student_for_tenant(DEFAULT_TENANT, student_id, fields)
+
+@app.get("/tenants/{tenant_id}/students/{student_id}")
+def get_student_for_tenant(tenant_id: str, student_id: str, fields: str = None):
+    try:
+        row = get_store(tenant_id).student(student_id, parse_fields(fields))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown student: {student_id}")
+    return records(row.to_frame().T)[0]
+
+@app.get("/students")
+def list_students(status: str = None, min_risk: float = None, max_risk: float = None,
+                  limit: int = 100, fields: str = None):
+    return list_students_for_tenant(DEFAULT_TENANT, status, min_risk, max_risk, limit, fields)
+
+@app.get("/tenants/{tenant_id}/students")
+def list_students_for_tenant(tenant_id: str, status: str = None, min_risk: float = None,
+                             max_risk: float = None, limit: int = 100, fields: str = None):
+    try:
+        rows = get_store(tenant_id).filter(status, min_risk, max_risk, parse_fields(fields), min(limit, 1000))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+    return {"count": len(rows), "students": records(rows)}
+
+@app.post("/students/ingest")
+def ingest_students(body: StudentRecords):
+    return ingest_students_for_tenant(DEFAULT_TENANT, body)
+
+@app.post("/tenants/{tenant_id}/students/ingest")
+def ingest_students_for_tenant(tenant_id: str, body: StudentRecords):
+    """Insert or update student records; only changed students are rescored"""
+    store = get_store(tenant_id)
+    records = pd.DataFrame(body.records)
+    if records.empty:
+        raise HTTPException(status_code=400, detail="No records")
+    try:
+        return ingest(store, get_models(tenant_id), records)
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail=e.report.summary())
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+
+@app.post("/scoring-runs")
+def create_scoring_run():
+    return create_scoring_run_for_tenant(DEFAULT_TENANT)
+
+@app.post("/tenants/{tenant_id}/scoring-runs")
+def create_scoring_run_for_tenant(tenant_id: str):
+    """Score the whole cohort, save the predictions and append them to the history"""
+    store = get_store(tenant_id)
+    predictions = score_cohort(store.read(), get_models(tenant_id))
+    store.write_predictions(predictions)
+    history = SnapshotStore(os.path.join(get_base(tenant_id), HISTORY_DIR))
+    run = history.append(predictions, source='api')
+    return {"run": os.path.basename(run), "students": len(predictions),
+            "risk_mean": float(predictions['risk'].mean())}
+
+@app.get("/scoring-runs")
+def scoring_runs(start: str = None, end: str = None):
+    return scoring_runs_for_tenant(DEFAULT_TENANT, start, end)
+
+@app.get("/tenants/{tenant_id}/scoring-runs")
+def scoring_runs_for_tenant(tenant_id: str, start: str = None, end: str = None):
+    """Cohort trend: one row per scoring run between start and end (YYYY-MM-DD)"""
+    history = SnapshotStore(os.path.join(get_base(tenant_id), HISTORY_DIR))
+    try:
+        trend = history.cohort_trend(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    trend['scored_at'] = trend['scored_at'].astype(str)
+    return {"runs": records(trend)}
+
+@app.get("/students/{student_id}/history")
+def student_history(student_id: str, start: str = None, end: str = None):
+    return student_history_for_tenant(DEFAULT_TENANT, student_id, start, end)
+
+@app.get("/tenants/{tenant_id}/students/{student_id}/history")
+def student_history_for_tenant(tenant_id: str, student_id: str, start: str = None, end: str = None):
+    """One student's risk and graduation predictions across scoring runs"""
+    history = SnapshotStore(os.path.join(get_base(tenant_id), HISTORY_DIR))
+    try:
+        rows = history.student_history(student_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows['scored_at'] = rows['scored_at'].astype(str)
+    return {"student_id": student_id, "runs": records(rows)}
+
+@app.get("/tenants")
+def tenants():
+    return {"tenants": registry.tenant_ids(), "loaded": registry.stats()['loaded']}
+
+@app.get("/tenants/{tenant_id}/health")
+def tenant_health(tenant_id: str):
+    get_models(tenant_id)
+    return {"status": "healthy", "tenant_id": tenant_id, "models_loaded": True}
+
+@app.get("/cache/stats")
+def cache_stats():
+    return registry.stats()
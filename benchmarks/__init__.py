@@ -0,0 +1,3 @@
+"""
+Performance benchmarks (run from the repo root: python -m benchmarks.<name>)
+"""
@@ -0,0 +1,68 @@
+"""
+Benchmark: cascaded inference (package only for predicted placements) vs
+running every model on every student
+"""
+
+import time
+
+import numpy as np
+
+from core.cascade import run_cascade, summarize_reports, CASCADE_BATCH
+from core.scoring import build_feature_matrix
+from core.tenants import load_models
+from benchmarks.common import make_cohort, banner
+
+N_STUDENTS = 200_000
+BATCH = CASCADE_BATCH
+MODEL_FILES = {
+    'grad': 'models/graduation_model.pkl',
+    'risk': 'models/risk_model.pkl',
+    'place': 'models/placement_model.pkl',
+    'package': 'models/package_model.pkl',
+    'le_grad': 'models/le_graduation.pkl',
+    'le_place': 'models/le_placement.pkl',
+    'features': 'models/feature_names.pkl',
+}
+
+
+def run_all(data, models):
+    """Baseline: all four models on all rows"""
+    X = build_feature_matrix(data, models['features'])
+    grad = models['grad'].predict_proba(X)
+    risk = models['risk'].predict(X)
+    place = models['le_place'].inverse_transform(models['place'].predict(X))
+    package = models['package'].predict(X)
+    return grad, risk, place, package
+
+
+def main():
+    banner(f"CASCADED INFERENCE BENCHMARK ({N_STUDENTS:,} students, batches of {BATCH:,})")
+
+    models = load_models('.', MODEL_FILES)
+    data = make_cohort(N_STUDENTS)
+
+    start = time.perf_counter()
+    _, _, full_place, full_package = run_all(data, models)
+    t_full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions, reports = run_cascade(data, models, batch=BATCH)
+    t_cascade = time.perf_counter() - start
+
+    print(f"\n{'batch':>6} {'rows':>7} {'placement':>10} {'package':>8} {'trees saved':>12} {'seconds':>8}")
+    for i, report in enumerate(reports):
+        stages = report['stages']
+        print(f"{i:6d} {report['rows']:7d} {stages['placement']['rows']:10d} {stages['package']['rows']:8d} "
+              f"{report['saved']:11.1%} {report['seconds']:8.2f}")
+    total = summarize_reports(reports)
+
+    scored = (predictions['exit_stage'] == 'package').to_numpy()
+    print(f"\n⏱️  All models, all rows:   {t_full:6.2f} s")
+    print(f"⚡ Cascade:                 {t_cascade:6.2f} s   ({t_full / t_cascade:.2f}x, "
+          f"{total['saved']:.1%} of tree evaluations skipped)")
+    print(f"\n🎯 Placement matches the full model: {(predictions['place'].to_numpy() == full_place).mean():.1%}")
+    print(f"   Package scored for {scored.sum():,} predicted placements, identical to the full model: "
+          f"{np.allclose(predictions['package'].to_numpy()[scored], full_package[scored])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: streamed mini-batch k-means vs full-batch KMeans (time and peak
+working memory beyond the feature matrix itself)
+"""
+
+import pickle
+import tracemalloc
+
+from sklearn.cluster import KMeans
+
+from core.clusters import CohortClusters, N_CLUSTERS
+from core.scoring import build_feature_matrix
+from benchmarks.common import make_cohort, best_of, banner
+
+SIZES = [100_000, 1_000_000]
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024**2
+
+
+def main():
+    banner("COHORT CLUSTERING BENCHMARK")
+    
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    
+    for n in SIZES:
+        X = build_feature_matrix(make_cohort(n), features)
+        print(f"\n   {n:,} students (feature matrix {X.nbytes / 1024**2:.0f} MB)")
+        
+        fit = lambda: CohortClusters(features).fit(X).predict(X)
+        print(f"      mini-batch: {best_of(fit, repeat=1):6.2f} s, peak extra memory {peak_mb(fit):7.1f} MB")
+        
+        if n <= 100_000:
+            full = lambda: KMeans(n_clusters=N_CLUSTERS, n_init=3, random_state=42).fit_predict(
+                (X - X.mean(axis=0)) / X.std(axis=0).clip(1e-12))
+            print(f"      full KMeans: {best_of(full, repeat=1):5.2f} s, peak extra memory {peak_mb(full):7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
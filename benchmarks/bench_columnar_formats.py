@@ -0,0 +1,76 @@
+"""
+Benchmark: /predict/batch with JSON vs NumPy .npz vs Arrow IPC bodies -
+the wire round trip alone (client encode, server decode, response encode,
+client decode) and end to end through the API
+"""
+
+import json
+import pickle
+import time
+import warnings
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from api.main import app, StudentRecords, records
+from core.columnar import JSON, NPZ, ARROW, ARROW_AVAILABLE, read_frame, write_frame
+from benchmarks.common import make_cohort, best_of, banner
+
+BATCH_SIZES = [1_000, 10_000, 50_000]
+
+
+def json_round_trip(students, predictions):
+    body = json.dumps({'records': students.to_dict(orient='records')})
+    decoded = pd.DataFrame(StudentRecords.model_validate_json(body).records)
+    response = json.dumps({'predictions': records(predictions)})
+    return decoded, pd.DataFrame(json.loads(response)['predictions'])
+
+
+def binary_round_trip(students, predictions, kind):
+    decoded = read_frame(write_frame(students, kind), kind)
+    return decoded, read_frame(write_frame(predictions, kind), kind)
+
+
+def post(client, students, kind):
+    if kind == JSON:
+        response = client.post('/predict/batch', json={'records': students.to_dict(orient='records')})
+        return pd.DataFrame(response.json()['predictions'])
+    response = client.post('/predict/batch', content=write_frame(students, kind),
+                           headers={'content-type': kind, 'accept': kind})
+    return read_frame(response.content, kind)
+
+
+def main():
+    banner("COLUMNAR WIRE FORMAT BENCHMARK (/predict/batch)")
+    warnings.filterwarnings('ignore')
+
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    cohort = make_cohort(max(BATCH_SIZES))[['student_id'] + features]
+    client = TestClient(app)
+    kinds = [JSON, NPZ] + ([ARROW] if ARROW_AVAILABLE else [])
+    names = {JSON: 'json', NPZ: 'npz', ARROW: 'arrow'}
+    post(client, cohort.head(10), JSON)     # load the models outside the timings
+
+    print(f"\n{'rows':>7} {'format':<7} {'request KB':>11} {'response KB':>12} "
+          f"{'wire s':>8} {'end-to-end s':>13} {'rows/s':>10}")
+    for n in BATCH_SIZES:
+        students = cohort.head(n)
+        predictions = post(client, students, NPZ)
+        for kind in kinds:
+            if kind == JSON:
+                request = json.dumps({'records': students.to_dict(orient='records')}).encode()
+                response = json.dumps({'predictions': records(predictions)}).encode()
+                wire = best_of(lambda: json_round_trip(students, predictions), repeat=3)
+            else:
+                request, response = write_frame(students, kind), write_frame(predictions, kind)
+                wire = best_of(lambda: binary_round_trip(students, predictions, kind), repeat=3)
+            start = time.perf_counter()
+            post(client, students, kind)
+            total = time.perf_counter() - start
+            print(f"{n:7d} {names[kind]:<7} {len(request) / 1024:11,.0f} {len(response) / 1024:12,.0f} "
+                  f"{wire:8.3f} {total:13.3f} {n / total:10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: compact float32/int16 forests vs the scikit-learn models -
+resident size, file size, prediction drift and throughput
+"""
+
+import os
+import pickle
+
+import numpy as np
+
+from core.compact import CompactForest, compact_path, export_compact, forest_nbytes
+from core.scoring import build_feature_matrix
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 20_000
+MODEL_FILES = {
+    'grad': 'models/graduation_model.pkl',
+    'risk': 'models/risk_model.pkl',
+    'place': 'models/placement_model.pkl',
+    'package': 'models/package_model.pkl',
+}
+
+
+def main():
+    banner(f"COMPACT MODEL BENCHMARK ({N_STUDENTS:,} students)")
+
+    models = {}
+    for key, path in MODEL_FILES.items():
+        with open(path, 'rb') as f:
+            models[key] = pickle.load(f)
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    if not all(os.path.exists(compact_path(key)) for key in models):
+        export_compact(models)
+    compact = {key: CompactForest.load(compact_path(key)) for key in models}
+    X = build_feature_matrix(make_cohort(N_STUDENTS), features)
+
+    print(f"\n{'model':<8} {'arrays KB':>10} {'compact KB':>11} {'pickle KB':>10} {'npz KB':>7} "
+          f"{'max diff':>9} {'labels':>7} {'sklearn s':>10} {'compact s':>10}")
+    for key, model in models.items():
+        forest = compact[key]
+        if forest.classes_ is not None:
+            reference, values = model.predict_proba(X), forest.predict_proba(X)
+            agree = f"{(model.predict(X) == forest.predict(X)).mean():.2%}"
+            predict, predict_compact = model.predict_proba, forest.predict_proba
+        else:
+            reference, values = model.predict(X), forest.predict(X)
+            agree = '-'
+            predict, predict_compact = model.predict, forest.predict
+        diff = np.abs(reference - values).max()
+        t_sklearn = best_of(lambda: predict(X), repeat=3)
+        t_compact = best_of(lambda: predict_compact(X), repeat=3)
+        print(f"{key:<8} {forest_nbytes(model) / 1024:10,.0f} {forest.nbytes / 1024:11,.0f} "
+              f"{os.path.getsize(MODEL_FILES[key]) / 1024:10,.0f} {os.path.getsize(compact_path(key)) / 1024:7,.0f} "
+              f"{diff:9.1e} {agree:>7} {t_sklearn:10.3f} {t_compact:10.3f}")
+
+    total = sum(forest_nbytes(m) for m in models.values())
+    total_compact = sum(f.nbytes for f in compact.values())
+    print(f"\n💾 Tree arrays: {total / 1024**2:.2f} MB -> {total_compact / 1024**2:.2f} MB "
+          f"({total / total_compact:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
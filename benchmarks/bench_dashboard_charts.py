@@ -0,0 +1,32 @@
+"""
+Benchmark: raw-series vs pre-binned CGPA histogram payload size
+"""
+
+import time
+
+import plotly.graph_objects as go
+
+from core.aggregates import compute_aggregates
+from benchmarks.common import make_cohort, banner
+
+
+def main():
+    banner("DASHBOARD CHART PAYLOAD BENCHMARK")
+    print(f"\n   {'Students':>10s} {'Raw JSON':>12s} {'Binned JSON':>12s} {'Binned build':>13s}")
+    
+    for n in [1_000, 10_000, 100_000, 1_000_000]:
+        data = make_cohort(n)
+        raw = go.Figure(go.Histogram(x=data['overall_cgpa'], nbinsx=25,
+            marker=dict(color=data['overall_cgpa'], colorscale='RdYlGn'))).to_json()
+        
+        start = time.perf_counter()
+        hist = compute_aggregates(data)['cgpa_hist']
+        binned = go.Figure(go.Bar(x=hist['centers'], y=hist['counts'], width=hist['width'],
+            marker=dict(color=hist['centers'], colorscale='RdYlGn'))).to_json()
+        elapsed = time.perf_counter() - start
+        
+        print(f"   {n:>10,d} {len(raw)/1024:>10.1f}KB {len(binned)/1024:>10.1f}KB {elapsed*1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: early-exit voting for the graduation forest vs predict_proba,
+on the real cohort and on a large synthetic one
+"""
+
+import pickle
+
+from core.scoring import build_feature_matrix
+from core.store import load_students
+from core.voting import EarlyExitForest, VOTING_MODES
+from benchmarks.common import make_cohort, best_of, banner
+
+N_SYNTHETIC = 200_000
+
+
+def compare(title, X, model, forest, repeat):
+    """Each mode against `exact` (same chunked evaluation, no early exit); sklearn shown for reference"""
+    reference = model.predict_proba(X)
+    labels = reference.argmax(axis=1)
+    t_sklearn = best_of(lambda: model.predict_proba(X), repeat=repeat)
+    t_exact = best_of(lambda: forest.predict_proba(X, 'exact'), repeat=repeat)
+
+    print(f"\n{title} ({len(X):,} students)")
+    print(f"   {'mode':<10} {'avg trees':>9} {'seconds':>8} {'vs exact':>9} {'labels':>8} {'max conf diff':>14}")
+    print(f"   {'sklearn':<10} {forest.n_trees:9d} {t_sklearn:8.3f} {t_exact / t_sklearn:8.2f}x {1:8.2%} {0:14.3f}")
+    for mode in VOTING_MODES:
+        proba, used = forest.predict_proba(X, mode)
+        seconds = t_exact if mode == 'exact' else best_of(lambda: forest.predict_proba(X, mode), repeat=repeat)
+        agree = (proba.argmax(axis=1) == labels).mean()
+        conf_diff = abs(proba.max(axis=1) - reference.max(axis=1)).max()
+        print(f"   {mode:<10} {used.mean():9.1f} {seconds:8.3f} {t_exact / seconds:8.2f}x {agree:8.2%} "
+              f"{conf_diff:14.3f}")
+
+def main():
+    banner("EARLY-EXIT VOTING BENCHMARK (graduation forest)")
+
+    with open('models/graduation_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    forest = EarlyExitForest(model)
+
+    compare("📚 Real cohort", build_feature_matrix(load_students(), features), model, forest, repeat=20)
+    compare("🧪 Synthetic cohort", build_feature_matrix(make_cohort(N_SYNTHETIC), features), model, forest, repeat=3)
+
+
+if __name__ == "__main__":
+    main()
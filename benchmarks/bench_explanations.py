@@ -0,0 +1,38 @@
+"""
+Benchmark: per-student TreeSHAP attributions vs one batched pass over the cohort
+"""
+
+import pickle
+
+import numpy as np
+
+from core.explain import TreeShapExplainer, explain_model
+from core.scoring import build_feature_matrix
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 5_000
+SAMPLE = 50
+
+
+def main():
+    banner(f"EXPLANATION BENCHMARK ({N_STUDENTS:,} students)")
+    
+    with open('models/risk_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    X = build_feature_matrix(make_cohort(N_STUDENTS), features)
+    
+    explainer = TreeShapExplainer(model, len(features))
+    single = best_of(lambda: [explainer.contributions(X[i:i + 1]) for i in range(SAMPLE)], repeat=1) / SAMPLE
+    batch = best_of(lambda: explain_model(model, X, features), repeat=1)
+    
+    attributions = explain_model(model, X, features)
+    error = np.abs(attributions.base + attributions.values.sum(axis=1) - model.predict(X)).max()
+    print(f"\n   Per student:  {single*1000:.2f} ms  -> {single * N_STUDENTS:.1f} s for the cohort")
+    print(f"   Batched:      {batch:.2f} s for the cohort ({batch / N_STUDENTS * 1e6:.1f} us/student)")
+    print(f"   Max |base + contributions - prediction|: {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: full reload and rescoring vs incremental ingest + refresh for a
+batch of updated students
+"""
+
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from core.aggregates import compute_aggregates
+from core.indexes import PercentileIndex, StudentIndex
+from core.ingest import ingest, LiveCohort
+from core.scoring import score_cohort
+from core.store import StudentStore, save_students, load_students, STORE_FILE
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 100_000
+N_CHANGED = 500
+MODEL_FILES = {
+    'grad': 'models/graduation_model.pkl',
+    'risk': 'models/risk_model.pkl',
+    'le_grad': 'models/le_graduation.pkl',
+    'features': 'models/feature_names.pkl',
+}
+
+
+def full_rebuild(base, models):
+    data = load_students(base)
+    return (score_cohort(data, models), compute_aggregates(data),
+            PercentileIndex(data, models['features']), StudentIndex(data))
+
+
+def main():
+    banner(f"INCREMENTAL RESCORING BENCHMARK ({N_STUDENTS:,} students, {N_CHANGED} updated)")
+    
+    models = {}
+    for key, path in MODEL_FILES.items():
+        with open(path, 'rb') as f:
+            models[key] = pickle.load(f)
+    data = make_cohort(N_STUDENTS)
+    base = tempfile.mkdtemp()
+    save_students(data, base)
+    store = StudentStore(os.path.join(base, STORE_FILE))
+    
+    predictions, aggregates, percentiles, students = full_rebuild(base, models)
+    live = LiveCohort('bench', data, predictions, aggregates, percentiles, students, store=store, models=models)
+    
+    rng = np.random.default_rng(0)
+    updates = data.sample(N_CHANGED, random_state=0)[['student_id', 'overall_attendance', 'sem8_attendance']]
+    updates['overall_attendance'] = rng.uniform(40, 100, N_CHANGED).round(1)
+    updates['sem8_attendance'] = updates['overall_attendance']
+    
+    full = best_of(lambda: full_rebuild(base, models), repeat=1)
+    summary = ingest(store, models, updates)
+    refresh = best_of(live.refresh, repeat=1)
+    
+    print(f"\n   Full reload + rescore + rebuild:   {full:7.2f} s")
+    print(f"   Ingest (upsert + rescore {summary['rescored']}):     {summary['seconds']:7.2f} s")
+    print(f"   Refresh loaded cohort:             {refresh:7.2f} s")
+    print(f"   Speedup: {full / (summary['seconds'] + refresh):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: full-scan peer comparison vs sorted-array PercentileIndex
+"""
+
+import pickle
+
+import numpy as np
+
+from core.indexes import PercentileIndex
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 1_000_000
+
+
+def scan_percentile(data, column, value):
+    return (data[column] < value).sum() / len(data) * 100
+
+
+def main():
+    banner(f"PERCENTILE INDEX BENCHMARK ({N_STUDENTS:,} students)")
+    
+    data = make_cohort(N_STUDENTS)
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    
+    build = best_of(lambda: PercentileIndex(data, features), repeat=1)
+    index = PercentileIndex(data, features)
+    student = data.iloc[N_STUDENTS // 2]
+    
+    scan = best_of(lambda: [scan_percentile(data, c, student[c]) for c in features])
+    lookup = best_of(lambda: index.percentiles(student), number=100)
+    
+    # Same answers as the full scan
+    for c in features:
+        assert np.isclose(index.percentile(c, student[c]), scan_percentile(data, c, student[c]))
+    
+    print(f"\n   Index build (once):          {build*1000:10.1f} ms")
+    print(f"   Full scans, {len(features)} features:    {scan*1000:10.2f} ms")
+    print(f"   Index lookups, {len(features)} features: {lookup*1000:10.3f} ms")
+    print(f"   Speedup:                     {scan/lookup:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: prediction history queries (one student's trend, a quarter's
+cohort trend) against scanning every stored run in full
+"""
+
+from datetime import datetime, timedelta
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.aggregates import AT_RISK_THRESHOLD
+from core.history import SnapshotStore
+from benchmarks.common import best_of, banner
+
+N_STUDENTS = 100_000
+N_RUNS = 52     # one year of weekly scoring runs
+
+
+def make_runs(history):
+    rng = np.random.default_rng(0)
+    ids = np.array([f"ECE{2020 + i % 4}{i:06d}" for i in range(N_STUDENTS)])
+    risk = rng.uniform(0, 100, N_STUDENTS)
+    grad = rng.choice(['Critical', 'At Risk', 'Average', 'Good', 'Excellent'], N_STUDENTS)
+    start = datetime(2025, 1, 6, 2, 0)
+    for week in range(N_RUNS):
+        risk = np.clip(risk + rng.normal(0, 3, N_STUDENTS), 0, 100)
+        history.append(pd.DataFrame({'student_id': ids, 'grad': grad, 'grad_conf': 80.0, 'risk': risk}),
+                       when=start + timedelta(weeks=week))
+    return ids
+
+
+def scan_student(history, student_id):
+    """Baseline: load every run's columns in full and filter"""
+    rows = []
+    for run, meta in history.runs():
+        ids = np.load(os.path.join(run, 'student_id.npy'))
+        risk = np.load(os.path.join(run, 'risk.npy'))
+        rows.append((meta['scored_at'], float(risk[ids == student_id][0])))
+    return rows
+
+
+def scan_trend(history, start, end):
+    """Baseline: recompute each run's summary from the full risk column"""
+    rows = []
+    for run, meta in history.runs():
+        if start <= meta['scored_at'][:10] <= end:
+            risk = np.load(os.path.join(run, 'risk.npy'))
+            rows.append((meta['scored_at'], float(risk.mean()), int((risk > AT_RISK_THRESHOLD).sum())))
+    return rows
+
+
+def main():
+    banner(f"PREDICTION HISTORY BENCHMARK ({N_STUDENTS:,} students x {N_RUNS} runs)")
+
+    root = tempfile.mkdtemp()
+    try:
+        history = SnapshotStore(root)
+        start = time.perf_counter()
+        ids = make_runs(history)
+        t_write = (time.perf_counter() - start) / N_RUNS
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        print(f"\n💾 Append one run:        {t_write*1000:8.1f} ms   ({size / N_RUNS / 1024**2:.1f} MB per run)")
+
+        student_id = ids[N_STUDENTS // 2]
+        fast = history.student_history(student_id)
+        slow = scan_student(history, student_id)
+        assert np.allclose(fast['risk'].to_numpy(), [r for _, r in slow], atol=1e-4)
+        t_fast = best_of(lambda: history.student_history(student_id))
+        t_slow = best_of(lambda: scan_student(history, student_id), repeat=3)
+        print(f"\n👤 One student, all runs")
+        print(f"   Full scan:             {t_slow*1000:8.1f} ms")
+        print(f"   mmap + binary search:  {t_fast*1000:8.1f} ms   ({t_slow / t_fast:.0f}x)")
+
+        batch = ids[::1000]
+        t_batch = best_of(lambda: history.students_history(batch))
+        print(f"   {len(batch)} students at once:  {t_batch*1000:8.1f} ms")
+
+        q_start, q_end = '2025-07-01', '2025-09-30'
+        trend = history.cohort_trend(q_start, q_end)
+        assert len(trend) == len(scan_trend(history, q_start, q_end))
+        t_trend = best_of(lambda: history.cohort_trend(q_start, q_end))
+        t_all = best_of(lambda: history.cohort_trend())
+        t_scan = best_of(lambda: scan_trend(history, q_start, q_end), repeat=3)
+        print(f"\n📉 Cohort trend, one quarter ({len(trend)} runs)")
+        print(f"   Recompute from columns:{t_scan*1000:8.1f} ms")
+        print(f"   meta.json, pruned:     {t_trend*1000:8.1f} ms   ({t_scan / t_trend:.0f}x)")
+        print(f"   meta.json, whole year: {t_all*1000:8.1f} ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
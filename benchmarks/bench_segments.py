@@ -0,0 +1,43 @@
+"""
+Benchmark: pandas boolean filtering vs BitmapIndex segment queries
+"""
+
+import pickle
+
+from core.segments import BitmapIndex, SEGMENT_NUMERIC_EXTRA
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 1_000_000
+
+QUERIES = [
+    ("current_backlogs > 2 AND overall_attendance < 70 AND internships_completed == 0",
+     lambda d: (d['current_backlogs'] > 2) & (d['overall_attendance'] < 70) & (d['internships_completed'] == 0)),
+    ("graduation_status == 'Critical' OR dropout_risk == 'High'",
+     lambda d: (d['graduation_status'] == 'Critical') | (d['dropout_risk'] == 'High')),
+    ("(overall_cgpa >= 8 OR coding_test_score >= 85) AND NOT scholarship == 'Yes'",
+     lambda d: ((d['overall_cgpa'] >= 8) | (d['coding_test_score'] >= 85)) & ~(d['scholarship'] == 'Yes')),
+]
+
+
+def main():
+    banner(f"SEGMENT EXPLORER BENCHMARK ({N_STUDENTS:,} students)")
+    
+    data = make_cohort(N_STUDENTS)
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    
+    build = best_of(lambda: BitmapIndex(data, features + SEGMENT_NUMERIC_EXTRA), repeat=1)
+    index = BitmapIndex(data, features + SEGMENT_NUMERIC_EXTRA)
+    size = sum(sum(b.nbytes for b in c.le) for c in index.columns.values())
+    print(f"\n   Index build (once): {build:.2f} s, bitmaps {size / 1024**2:.1f} MB")
+    
+    for text, mask in QUERIES:
+        assert index.count(text) == int(mask(data).sum())
+        scan = best_of(lambda: int(mask(data).sum()))
+        bitmap = best_of(lambda: index.count(text))
+        print(f"\n   {text}")
+        print(f"      count={index.count(text):,}  pandas {scan*1000:7.2f} ms  bitmap {bitmap*1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
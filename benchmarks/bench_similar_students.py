@@ -0,0 +1,46 @@
+"""
+Benchmark: similar-student queries at 1M students (float32 scan with
+re-ranking, against a full sort of all distances)
+"""
+
+import pickle
+
+import numpy as np
+
+from core.neighbors import SimilarityIndex
+from core.scoring import build_feature_matrix
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 1_000_000
+N_QUERIES = 20
+N_UPDATES = 1_000
+
+
+def main():
+    banner(f"SIMILAR STUDENTS BENCHMARK ({N_STUDENTS:,} students)")
+    
+    with open('models/feature_names.pkl', 'rb') as f:
+        features = pickle.load(f)
+    data = make_cohort(N_STUDENTS)
+    X = build_feature_matrix(data, features)
+    ids = data['student_id'].to_numpy()
+    queries = X[np.random.default_rng(0).choice(len(X), N_QUERIES, replace=False)]
+    
+    index = SimilarityIndex(X, ids)
+    Z = index.transform(X)
+    naive = best_of(lambda: [np.argsort(((Z - index.transform(q)) ** 2).sum(axis=1))[:5] for q in queries],
+                    repeat=1) / N_QUERIES
+    print(f"\n   Full sort of all distances: {naive*1000:7.2f} ms/query")
+    
+    build = best_of(lambda: SimilarityIndex(X, ids), repeat=1)
+    index = SimilarityIndex(X, ids)
+    query = best_of(lambda: [index.query(q) for q in queries], repeat=3) / N_QUERIES
+    update = best_of(lambda: index.upsert(X[:N_UPDATES] * 1.01, ids[:N_UPDATES]), repeat=1)
+    buffered = best_of(lambda: [index.query(q) for q in queries], repeat=3) / N_QUERIES
+    print(f"\n   Scan: build {build:.2f} s, query {query*1000:.2f} ms")
+    print(f"      +{N_UPDATES:,} upserts in {update*1000:.1f} ms (no rebuild), "
+          f"query with buffer {buffered*1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Benchmark: boolean-mask student lookup vs StudentIndex hash lookup
+"""
+
+from core.indexes import StudentIndex
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 200_000
+
+
+def main():
+    banner(f"STUDENT LOOKUP BENCHMARK ({N_STUDENTS:,} students)")
+    
+    data = make_cohort(N_STUDENTS)
+    build = best_of(lambda: StudentIndex(data), repeat=1)
+    index = StudentIndex(data)
+    student_id = data['student_id'].iloc[N_STUDENTS - 1]
+    
+    scan = best_of(lambda: data[data['student_id'] == student_id].iloc[0], number=10)
+    lookup = best_of(lambda: index.lookup(data, student_id), number=1000)
+    
+    assert index.lookup(data, student_id).equals(data[data['student_id'] == student_id].iloc[0])
+    
+    print(f"\n   Index build (once):  {build*1000:10.1f} ms")
+    print(f"   Boolean-mask lookup: {scan*1000:10.3f} ms")
+    print(f"   Hash index lookup:   {lookup*1000:10.3f} ms")
+    print(f"   Speedup:             {scan/lookup:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
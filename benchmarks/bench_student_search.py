@@ -0,0 +1,35 @@
+"""
+Benchmark: PrefixIndex top-k search for the student picker
+"""
+
+import numpy as np
+
+from core.indexes import PrefixIndex
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 500_000
+TOP_K = 20
+
+
+def main():
+    banner(f"STUDENT SEARCH BENCHMARK ({N_STUDENTS:,} students)")
+    
+    data = make_cohort(N_STUDENTS)
+    surnames = np.array(['Sharma', 'Patel', 'Kumar', 'Reddy', 'Rao', 'Hegde', 'Shetty', 'Nair'])
+    data['name'] = [f"Student {i+1} {s}" for i, s in enumerate(surnames[np.arange(N_STUDENTS) % len(surnames)])]
+    
+    build = best_of(lambda: PrefixIndex(data), repeat=1)
+    index = PrefixIndex(data)
+    
+    print(f"\n   Index build (once): {build*1000:10.1f} ms")
+    print(f"   Indexed keys:       {len(index.keys):10,d}")
+    for query in ['ECE2022', 'ECE20221234', 'Student 4999', 'sha', 'zzz']:
+        t = best_of(lambda: index.search(query, k=TOP_K), number=100)
+        print(f"   search({query!r:15s}) -> {len(index.search(query, k=TOP_K)):3d} hits in {t*1000:7.3f} ms")
+    
+    scan = best_of(lambda: data[data['student_id'].str.startswith('ECE20221234')].head(TOP_K), repeat=3)
+    print(f"\n   Full-column str.startswith scan: {scan*1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: whole-file CSV load vs indexed SQLite lookups
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from core.store import StudentStore, save_students, load_students, CSV_FILE, STORE_FILE
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 200_000
+
+
+def main():
+    banner(f"STUDENT STORE BENCHMARK ({N_STUDENTS:,} students)")
+    
+    data = make_cohort(N_STUDENTS)
+    base = tempfile.mkdtemp()
+    write = best_of(lambda: save_students(data, base), repeat=1)
+    store = StudentStore(os.path.join(base, STORE_FILE))
+    sid = data['student_id'].iloc[N_STUDENTS // 2]
+    
+    csv_path = os.path.join(base, CSV_FILE)
+    csv_load = best_of(lambda: pd.read_csv(csv_path), repeat=1)
+    
+    def csv_one_student():
+        df = pd.read_csv(csv_path)
+        return df[df['student_id'] == sid]
+    
+    csv_one = best_of(csv_one_student, repeat=1)
+    one = best_of(lambda: store.student(sid), number=50)
+    few_cols = best_of(lambda: store.student(sid, ['student_id', 'overall_cgpa', 'risk_score']), number=50)
+    critical = best_of(lambda: store.filter(status='Critical', min_risk=80, limit=100), number=10)
+    full = best_of(lambda: load_students(base), repeat=1)
+    
+    print(f"\n   Write CSV + store:                   {write:8.2f} s")
+    print(f"   CSV load (whole file):               {csv_load*1000:8.1f} ms")
+    print(f"   CSV load + filter for one student:   {csv_one*1000:8.1f} ms")
+    print(f"   Store: one student, all columns:     {one*1000:8.2f} ms")
+    print(f"   Store: one student, 3 columns:       {few_cols*1000:8.2f} ms")
+    print(f"   Store: top 100 Critical, risk >= 80: {critical*1000:8.2f} ms")
+    print(f"   Store: whole cohort:                 {full*1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: full forest predict vs IncrementalForest for what-if slider changes
+"""
+
+import pickle
+
+import numpy as np
+
+from core.scoring import build_feature_matrix
+from core.whatif import WhatIfSimulator
+from benchmarks.common import make_cohort, best_of, banner
+
+N_STUDENTS = 200
+MODEL_FILES = {
+    'grad': 'models/graduation_model.pkl',
+    'risk': 'models/risk_model.pkl',
+    'place': 'models/placement_model.pkl',
+    'le_grad': 'models/le_graduation.pkl',
+    'le_place': 'models/le_placement.pkl',
+    'features': 'models/feature_names.pkl',
+}
+SLIDERS = {'overall_attendance': (40, 100), 'current_backlogs': (0, 8), 'coding_test_score': (30, 100)}
+
+
+def main():
+    banner("WHAT-IF SIMULATOR BENCHMARK")
+    
+    models = {}
+    for name, path in MODEL_FILES.items():
+        with open(path, 'rb') as f:
+            models[name] = pickle.load(f)
+    X = build_feature_matrix(make_cohort(N_STUDENTS), models['features'])
+    rng = np.random.default_rng(0)
+    
+    for feature, (lo, hi) in SLIDERS.items():
+        col = models['features'].index(feature)
+        sim = WhatIfSimulator(models, X[0])
+        value = float(rng.integers(lo, hi + 1))
+        x = X[0].copy()
+        x[col] = value
+        
+        full = best_of(lambda: (models['grad'].predict_proba([x]), models['risk'].predict([x]),
+                                models['place'].predict_proba([x])))
+        incremental = best_of(lambda: sim.simulate({feature: value}), number=20)
+        result = sim.simulate({feature: value})
+        assert abs(result['risk'] - models['risk'].predict([x])[0]) < 1e-6
+        print(f"\n   {feature} -> {value:.1f}")
+        print(f"      full predict {full*1000:7.2f} ms  incremental {incremental*1000:6.2f} ms  "
+              f"({result['trees_evaluated']}/{sim.total_trees} trees re-walked)")
+
+
+if __name__ == "__main__":
+    main()
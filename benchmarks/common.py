@@ -0,0 +1,32 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import time
+import contextlib
+import io
+
+from phase1_generate_dataset import generate_advanced_btech_dataset
+
+
+def make_cohort(n_students):
+    """Synthetic cohort of `n_students` using the phase 1 generator (quietly)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generate_advanced_btech_dataset(n_students=n_students)
+
+
+def best_of(fn, repeat=5, number=1):
+    """Best wall-clock time in seconds of `number` calls, over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def banner(title):
+    print("="*70)
+    print(" "*10 + title)
+    print("="*70)
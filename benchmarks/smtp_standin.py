@@ -0,0 +1,68 @@
+"""
+Local SMTP stand-in: accepts and counts messages without delivering them.
+Run standalone for the app (python -m benchmarks.smtp_standin) with
+SMTP_HOST=localhost SMTP_PORT=8025.
+"""
+
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+    
+    def handle(self):
+        self.reply('220 localhost SMTP stand-in')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode(errors='replace').strip().upper()
+            if cmd.startswith(('HELO', 'EHLO')):
+                self.reply('250 localhost')
+            elif cmd.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self.reply('250 OK')
+            elif cmd == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                if self.server.delay:
+                    time.sleep(self.server.delay)
+                with self.server.lock:
+                    self.server.received += 1
+                self.reply('250 OK queued')
+            elif cmd == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded SMTP sink; `delay` simulates per-message server latency"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0):
+        super().__init__((host, port), _SMTPHandler)
+        self.delay = delay
+        self.received = 0
+        self.lock = threading.Lock()
+    
+    @property
+    def port(self):
+        return self.server_address[1]
+    
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    server = LocalSMTPServer(port=8025)
+    print(f"📨 SMTP stand-in listening on 127.0.0.1:{server.port} (Ctrl+C to stop)")
+    server.serve_forever()
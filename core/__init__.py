@@ -0,0 +1,3 @@
+"""
+Shared analytics core for the Streamlit app, API and training scripts
+"""
@@ -0,0 +1,105 @@
+"""
+Cohort Aggregates
+Dashboard and sidebar statistics, computed once per data fingerprint and
+updated incrementally when a few students change
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.charts import histogram
+
+RISK_BINS = [0, 30, 50, 70, 100]
+RISK_LABELS = ['Low', 'Medium', 'High', 'Critical']
+AT_RISK_THRESHOLD = 50
+EXCELLENT_CGPA = 8.0
+CGPA_HIST_BINS = 25
+
+
+def fingerprint(data, paths=()):
+    """Short content hash of the data plus size/mtime of the given files (models)"""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    h.update(','.join(map(str, data.columns)).encode())
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def risk_categories(risk):
+    """
+    Bin index into RISK_LABELS for each risk score, -1 if outside the bins.
+    Same right-closed bins as pd.cut(risk, bins=RISK_BINS).
+    """
+    risk = np.asarray(risk, dtype=float)
+    idx = np.searchsorted(RISK_BINS, risk, side='left') - 1
+    valid = (risk > RISK_BINS[0]) & (risk <= RISK_BINS[-1])
+    return np.where(valid, idx, -1)
+
+
+def compute_aggregates(data):
+    """All dashboard and sidebar statistics (and chart bins) in one pass over the needed columns"""
+    risk = data['risk_score'].to_numpy(dtype=float)
+    cgpa = data['overall_cgpa'].to_numpy(dtype=float)
+    
+    cats = risk_categories(risk)
+    counts = np.bincount(cats[cats >= 0], minlength=len(RISK_LABELS))
+    
+    valid = ~np.isnan(cgpa)
+    return {
+        'students': len(data),
+        'at_risk': int((risk > AT_RISK_THRESHOLD).sum()),
+        'excellent': int((cgpa >= EXCELLENT_CGPA).sum()),
+        'avg_cgpa': float(cgpa[valid].mean()) if valid.any() else 0.0,
+        'cgpa_sum': float(cgpa[valid].sum()),
+        'cgpa_count': int(valid.sum()),
+        'risk_counts': pd.Series(counts, index=RISK_LABELS),
+        'cgpa_hist': histogram(cgpa, nbins=CGPA_HIST_BINS),
+    }
+
+
+def _partial(rows):
+    """Additive pieces of the aggregates for a handful of rows"""
+    risk = rows['risk_score'].to_numpy(dtype=float)
+    cgpa = rows['overall_cgpa'].to_numpy(dtype=float)
+    cats = risk_categories(risk)
+    valid = ~np.isnan(cgpa)
+    return {
+        'students': len(rows),
+        'at_risk': int((risk > AT_RISK_THRESHOLD).sum()),
+        'excellent': int((cgpa >= EXCELLENT_CGPA).sum()),
+        'cgpa_sum': float(cgpa[valid].sum()),
+        'cgpa_count': int(valid.sum()),
+        'risk_counts': np.bincount(cats[cats >= 0], minlength=len(RISK_LABELS)),
+        'cgpa': cgpa[valid],
+    }
+
+
+def update_aggregates(aggregates, removed, added, data):
+    """
+    Aggregates after replacing the rows of `removed` with those of `added`
+    (old and new versions of changed students, plus any new students),
+    without a pass over the cohort. `data` is the updated cohort, only read
+    when a new CGPA falls outside the existing histogram range.
+    """
+    out, rem, add = dict(aggregates), _partial(removed), _partial(added)
+    for key in ('students', 'at_risk', 'excellent', 'cgpa_sum', 'cgpa_count'):
+        out[key] = aggregates[key] - rem[key] + add[key]
+    out['avg_cgpa'] = out['cgpa_sum'] / out['cgpa_count'] if out['cgpa_count'] else 0.0
+    out['risk_counts'] = aggregates['risk_counts'] - rem['risk_counts'] + add['risk_counts']
+    
+    hist = aggregates['cgpa_hist']
+    if len(hist['centers']):
+        edges = np.append(hist['centers'] - hist['width'] / 2, hist['centers'][-1] + hist['width'] / 2)
+        inside = lambda v: ((v >= edges[0]) & (v <= edges[-1])).all()
+        if inside(add['cgpa']) and inside(rem['cgpa']):
+            delta = np.histogram(add['cgpa'], bins=edges)[0] - np.histogram(rem['cgpa'], bins=edges)[0]
+            out['cgpa_hist'] = dict(hist, counts=hist['counts'] + delta)
+            return out
+    out['cgpa_hist'] = histogram(data['overall_cgpa'], nbins=CGPA_HIST_BINS)
+    return out
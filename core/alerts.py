@@ -0,0 +1,359 @@
+"""
+Alert Pipeline
+Vectorized email rendering, a durable SQLite outbox with deduplication,
+and a pooled, rate-limited SMTP sender that drains it in the background
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+import os
+import queue
+import smtplib
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+CRITICAL_RISK = 70
+ADVISOR_EMAIL = 'advisor@university.edu'
+
+
+def alert_config_from_env():
+    """SMTP and pipeline settings (SMTP_HOST unset means queue-only mode)"""
+    return {
+        'smtp_host': os.environ.get('SMTP_HOST'),
+        'smtp_port': int(os.environ.get('SMTP_PORT', 25)),
+        'smtp_user': os.environ.get('SMTP_USER'),
+        'smtp_password': os.environ.get('SMTP_PASSWORD'),
+        'smtp_tls': os.environ.get('SMTP_TLS', '0') == '1',
+        'sender': os.environ.get('ALERT_SENDER', 'alerts@university.edu'),
+        'email_domain': os.environ.get('ALERT_EMAIL_DOMAIN', 'university.edu'),
+        'outbox_path': os.environ.get('ALERT_OUTBOX', 'data/outbox.db'),     # relative to the tenant directory
+        'dedup_hours': float(os.environ.get('ALERT_DEDUP_HOURS', 72)),
+        'rate_per_sec': float(os.environ.get('ALERT_RATE_PER_SEC', 10)),
+        'pool_size': int(os.environ.get('ALERT_POOL_SIZE', 4)),
+    }
+
+
+# ==========================================
+# RENDERING
+# ==========================================
+
+def _fmt(series, spec):
+    return series.map(spec.format)
+
+
+def render_emails(students, risk, email_domain='university.edu'):
+    """
+    Render alert emails for every row of `students` in one column-wise pass.
+    `risk` holds the predicted risk score aligned with `students`.
+    Returns student_id, name, risk, recipient, subject and body columns.
+    """
+    name = students['name'].astype(str)
+    risk = pd.Series(np.asarray(risk, dtype=float), index=students.index)
+    attendance = students.get('overall_attendance', pd.Series(0.0, index=students.index))
+    backlogs = students.get('current_backlogs', pd.Series(0, index=students.index))
+    action = pd.Series(np.where(risk > CRITICAL_RISK,
+                                '🚨 CRITICAL: Immediate intervention needed!',
+                                '⚠️ WARNING: Action recommended'), index=students.index)
+
+    body = ("\nDear " + name + ",\n\nCURRENT STATUS:\n"
+            "• CGPA: " + _fmt(students['overall_cgpa'], '{:.2f}') + "\n"
+            "• Risk Score: " + _fmt(risk, '{:.1f}') + "/100\n"
+            "• Attendance: " + _fmt(attendance, '{:.1f}') + "%\n"
+            "• Backlogs: " + backlogs.astype(int).astype(str) + "\n\n"
+            "ACTION REQUIRED:\n" + action + "\n\n"
+            "NEXT STEPS:\n"
+            "1. Meet academic advisor within 48 hours\n"
+            "2. Attend all classes without exception\n"
+            "3. Check detailed plan in system\n\n"
+            f"Support: {ADVISOR_EMAIL}\n\n"
+            "Best regards,\n"
+            "Student Performance System\n")
+
+    return pd.DataFrame({
+        'student_id': students['student_id'].values,
+        'name': name.values,
+        'risk': risk.values,
+        'recipient': (students['student_id'].astype(str).str.lower() + '@' + email_domain).values,
+        'subject': ("🚨 Academic Alert - " + name).values,
+        'body': body.values,
+    })
+
+
+# ==========================================
+# DURABLE OUTBOX
+# ==========================================
+
+class Outbox:
+    """SQLite-backed queue of alert emails; survives restarts"""
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                recipient TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, id);
+            CREATE INDEX IF NOT EXISTS idx_outbox_student ON outbox(student_id, created_at);
+        """)
+        self.conn.commit()
+
+    def recently_alerted(self, window_hours, now=None):
+        """student_ids with a non-failed alert created inside the window"""
+        since = (now or time.time()) - window_hours * 3600
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT student_id FROM outbox WHERE created_at >= ? AND status != 'failed'",
+                (since,)).fetchall()
+        return {r[0] for r in rows}
+
+    def enqueue(self, emails, window_hours=72, now=None):
+        """
+        Queue rendered emails, skipping students already alerted within
+        `window_hours`. Returns (queued, skipped).
+        """
+        now = now or time.time()
+        since = now - window_hours * 3600
+        fresh = emails.drop_duplicates('student_id')
+        rows = [(sid, recipient, subject, body, now, sid, since) for sid, recipient, subject, body
+                in zip(fresh['student_id'], fresh['recipient'], fresh['subject'], fresh['body'])]
+        # The recent-alert check runs inside each INSERT, so two sessions or processes
+        # sharing the outbox cannot both queue the same student
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO outbox (student_id, recipient, subject, body, created_at) "
+                "SELECT ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM outbox WHERE student_id = ? "
+                "AND created_at >= ? AND status != 'failed')",
+                rows)
+            queued = self.conn.total_changes - before
+            self.conn.commit()
+        return queued, len(emails) - queued
+
+    def claim(self, limit):
+        """Mark up to `limit` pending messages as sending and return them"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, recipient, subject, body FROM outbox WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (limit,)).fetchall()
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                [(r[0],) for r in rows])
+            self.conn.commit()
+        return rows
+
+    def mark(self, results, max_attempts=3):
+        """Record (id, error) send results; failed messages are retried up to max_attempts"""
+        now = time.time()
+        with self._lock:
+            for msg_id, error in results:
+                if error is None:
+                    self.conn.execute("UPDATE outbox SET status = 'sent', sent_at = ?, error = NULL WHERE id = ?",
+                                      (now, msg_id))
+                else:
+                    self.conn.execute(
+                        "UPDATE outbox SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                        "error = ? WHERE id = ?", (max_attempts, error, msg_id))
+            self.conn.commit()
+
+    def requeue(self, ids):
+        """Return claimed messages to the queue"""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'pending' WHERE id = ? AND status = 'sending'",
+                [(i,) for i in ids])
+            self.conn.commit()
+
+    def requeue_stale(self):
+        """Return messages left in 'sending' by a crashed sender to the queue"""
+        with self._lock:
+            self.conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+            self.conn.commit()
+
+    def depth(self):
+        """Message counts by status"""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        counts = {'pending': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+
+# ==========================================
+# POOLED, RATE-LIMITED SMTP SENDER
+# ==========================================
+
+class RateLimiter:
+    """Token bucket shared by all sender threads"""
+
+    def __init__(self, rate_per_sec, burst=None):
+        self.rate = rate_per_sec
+        self.capacity = burst or max(1.0, rate_per_sec)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPPool:
+    """Fixed-size pool of reusable SMTP connections"""
+
+    def __init__(self, host, port=25, size=4, user=None, password=None, use_tls=False, timeout=10):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.use_tls, self.timeout = use_tls, timeout
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)  # connections are opened lazily
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password)
+        return conn
+
+    def send(self, message):
+        conn = self._idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            try:
+                conn.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                conn = self._connect()
+                conn.send_message(message)
+        except Exception:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            conn = None
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                try:
+                    conn.quit()
+                except Exception:
+                    pass
+
+
+class AlertSender:
+    """Drains the outbox through an SMTPPool on a background thread"""
+
+    def __init__(self, outbox, pool, sender, rate_per_sec=10, batch_size=100, poll_seconds=2.0):
+        self.outbox = outbox
+        self.pool = pool
+        self.sender = sender
+        self.limiter = RateLimiter(rate_per_sec)
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.workers = ThreadPoolExecutor(max_workers=pool.size)
+        self.stats = {'sent': 0, 'failed': 0, 'errors': 0, 'busy_seconds': 0.0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _send_one(self, row):
+        msg_id, recipient, subject, body = row
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = recipient
+        message['Subject'] = subject
+        message.set_content(body)
+        self.limiter.acquire()
+        try:
+            self.pool.send(message)
+            return msg_id, None
+        except Exception as e:
+            return msg_id, str(e)
+
+    def drain_once(self):
+        """Send one batch of pending messages; returns the number claimed"""
+        rows = self.outbox.claim(self.batch_size)
+        if not rows:
+            return 0
+        start = time.perf_counter()
+        try:
+            results = list(self.workers.map(self._send_one, rows))
+            self.stats['busy_seconds'] += time.perf_counter() - start
+            self.outbox.mark(results)
+        except Exception:
+            # Messages already marked sent stay sent; the rest go back to the queue
+            self.outbox.requeue([r[0] for r in rows])
+            raise
+        failed = sum(1 for _, error in results if error is not None)
+        self.stats['sent'] += len(results) - failed
+        self.stats['failed'] += failed
+        return len(rows)
+
+    def throughput(self):
+        """Messages per second while actively sending"""
+        busy = self.stats['busy_seconds']
+        return self.stats['sent'] / busy if busy else 0.0
+
+    def _run(self):
+        stale = True
+        while not self._stop.is_set():
+            # A failed batch (e.g. the database is briefly locked) is logged and retried
+            # on the next poll instead of ending the thread
+            try:
+                if stale:
+                    self.outbox.requeue_stale()
+                    stale = False
+                claimed = self.drain_once()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ Alert sender error: {e}")
+                claimed = 0
+            if claimed == 0:
+                self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='alert-sender', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.workers.shutdown(wait=True)
+        self.pool.close()
@@ -0,0 +1,48 @@
+"""
+Chart Data
+Server-side binning and downsampling so chart payloads stay a fixed size
+"""
+
+import numpy as np
+
+SCATTER_BUDGET = 2000
+
+
+def histogram(values, nbins=25, value_range=None):
+    """Pre-binned histogram: bin centers, counts and bin width"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {'centers': np.array([]), 'counts': np.array([], dtype=int), 'width': 0.0}
+    
+    counts, edges = np.histogram(values, bins=nbins, range=value_range)
+    return {
+        'centers': (edges[:-1] + edges[1:]) / 2,
+        'counts': counts,
+        'width': float(edges[1] - edges[0]),
+    }
+
+
+def downsample_points(x, y, budget=SCATTER_BUDGET):
+    """
+    Reduce a scatter to at most ~`budget` points by gridding the plane and
+    keeping one point per occupied cell, with the cell's point count.
+    Sparse regions and outliers survive; dense regions collapse.
+    Returns row positions into the inputs plus the count per kept point.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= budget:
+        return {'positions': np.arange(n), 'counts': np.ones(n, dtype=int)}
+    
+    side = max(int(np.sqrt(budget)), 1)
+    
+    def cell(v):
+        lo, hi = np.nanmin(v), np.nanmax(v)
+        scaled = (v - lo) / (hi - lo) if hi > lo else np.zeros_like(v)
+        return np.clip((scaled * side).astype(int), 0, side - 1)
+    
+    cells = cell(x) * side + cell(y)
+    _, positions, counts = np.unique(cells, return_index=True, return_counts=True)
+    return {'positions': positions, 'counts': counts}
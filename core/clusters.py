@@ -0,0 +1,122 @@
+"""
+Cohort Clusters
+Mini-batch k-means over the standardized model features. Fitting streams
+fixed-size batches through partial_fit, so memory stays bounded by the
+batch size rather than the cohort size; profiles summarise each cluster
+for the dashboard.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+N_CLUSTERS = 6
+CLUSTER_BATCH = 10_000
+CLUSTER_EPOCHS = 3
+
+CLUSTER_FILES = {
+    'model': 'models/cluster_model.pkl',
+    'assignments': 'models/cluster_assignments.pkl',
+    'profiles': 'models/cluster_profiles.pkl',
+}
+
+PROFILE_COLUMNS = ['overall_cgpa', 'overall_attendance', 'current_backlogs', 'coding_test_score', 'risk_score']
+
+
+def iter_batches(X, batch=CLUSTER_BATCH, seed=None):
+    """Row batches of X, in shuffled order when `seed` is given"""
+    order = np.random.default_rng(seed).permutation(len(X)) if seed is not None else np.arange(len(X))
+    for start in range(0, len(X), batch):
+        yield X[order[start:start + batch]]
+
+
+class CohortClusters:
+    """Standardization plus a MiniBatchKMeans fitted with partial_fit"""
+
+    def __init__(self, features, n_clusters=N_CLUSTERS, batch=CLUSTER_BATCH, random_state=42):
+        self.features = list(features)
+        self.n_clusters = n_clusters
+        self.batch = batch
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch, random_state=random_state,
+                                      n_init=3)
+        self.mean = None
+        self.scale = None
+
+    def _fit_scaler(self, X):
+        # Streaming mean/variance so the scaler needs no full-size copy either
+        n, total, total_sq = 0, 0.0, 0.0
+        for part in iter_batches(X, self.batch):
+            n += len(part)
+            total = total + part.sum(axis=0)
+            total_sq = total_sq + (part ** 2).sum(axis=0)
+        self.mean = total / n
+        std = np.sqrt(np.maximum(total_sq / n - self.mean ** 2, 0))
+        self.scale = np.where(std > 0, std, 1.0)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=float) - self.mean) / self.scale
+
+    def fit(self, X, epochs=CLUSTER_EPOCHS):
+        X = np.asarray(X, dtype=float)
+        self._fit_scaler(X)
+        for epoch in range(epochs):
+            for part in iter_batches(X, self.batch, seed=epoch):
+                # partial_fit needs at least n_clusters rows for its first call
+                if len(part) >= self.n_clusters:
+                    self.kmeans.partial_fit(self.transform(part))
+        return self
+
+    def predict(self, X):
+        """(cluster, standardized distance to its centroid) for every row, in batches"""
+        X = np.asarray(X, dtype=float)
+        labels = np.empty(len(X), dtype=np.int16)
+        distances = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), self.batch):
+            Z = self.transform(X[start:start + self.batch])
+            d = self.kmeans.transform(Z)
+            labels[start:start + len(Z)] = d.argmin(axis=1)
+            distances[start:start + len(Z)] = d.min(axis=1)
+        return labels, distances
+
+    @property
+    def centroids(self):
+        """Cluster centres in original feature units"""
+        return pd.DataFrame(self.kmeans.cluster_centers_ * self.scale + self.mean, columns=self.features)
+
+    def describe(self, cluster, k=2):
+        """Short label from the k features where the centroid deviates most from the cohort"""
+        z = pd.Series(self.kmeans.cluster_centers_[cluster], index=self.features)
+        top = z.reindex(z.abs().sort_values(ascending=False).index[:k])
+        return ', '.join(f"{'↑' if v > 0 else '↓'} {f.replace('_', ' ')}" for f, v in top.items())
+
+
+def cluster_profiles(df, labels, clusters):
+    """Size, share, key averages and outcome rates per cluster"""
+    frame = df.reindex(columns=PROFILE_COLUMNS).assign(cluster=np.asarray(labels))
+    if 'placement_status' in df.columns:
+        frame['placed'] = (df['placement_status'] == 'Placed').to_numpy()
+    profiles = frame.groupby('cluster').mean()
+    profiles.insert(0, 'students', frame.groupby('cluster').size())
+    profiles.insert(1, 'share', profiles['students'] / len(frame) * 100)
+    profiles.insert(0, 'label', [clusters.describe(c) for c in profiles.index])
+    return profiles.reindex(range(clusters.n_clusters)).fillna({'students': 0, 'share': 0})
+
+
+def save_clusters(clusters, assignments, profiles, files=CLUSTER_FILES):
+    for key, obj in [('model', clusters), ('assignments', assignments), ('profiles', profiles)]:
+        with open(files[key], 'wb') as f:
+            pickle.dump(obj, f)
+
+
+def load_cluster_artifacts(files=CLUSTER_FILES):
+    """Persisted clusters as {'model', 'assignments', 'profiles'}, or None if not trained yet"""
+    if not all(os.path.exists(path) for path in files.values()):
+        return None
+    artifacts = {}
+    for key, path in files.items():
+        with open(path, 'rb') as f:
+            artifacts[key] = pickle.load(f)
+    return artifacts
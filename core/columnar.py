@@ -0,0 +1,88 @@
+"""
+Columnar Wire Formats
+Binary encodings of a DataFrame for batch prediction requests and
+responses, one array per column, so thousands of rows cross the API
+without a Python object per value:
+- NumPy .npz: one array per column (numbers as-is, text as fixed-width
+  unicode); always available, read without pickle
+- Arrow IPC stream: used when pyarrow is installed
+JSON remains the default.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+JSON = 'application/json'
+NPZ = 'application/x-npz'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+MEDIA_TYPES = (JSON, NPZ, ARROW) if ARROW_AVAILABLE else (JSON, NPZ)
+BINARY_TYPES = MEDIA_TYPES[1:]
+
+
+def media_type(header):
+    """Bare media type of a Content-Type header ('' when missing)"""
+    return (header or '').split(';')[0].strip().lower()
+
+
+def negotiate(accept):
+    """
+    First media type in an Accept header that can be produced, in the
+    client's order (q-values are not weighed); JSON for a missing header or
+    */*. None when nothing listed is supported.
+    """
+    if not accept:
+        return JSON
+    for part in accept.split(','):
+        wanted = media_type(part)
+        if wanted in ('*/*', 'application/*'):
+            return JSON
+        if wanted in MEDIA_TYPES:
+            return wanted
+    return None
+
+
+def read_frame(body, kind):
+    """DataFrame from an NPZ or Arrow request body; ValueError if malformed"""
+    if kind not in BINARY_TYPES:
+        raise ValueError(f"Unsupported media type: {kind}")
+    try:
+        if kind == ARROW:
+            return pa.ipc.open_stream(body).read_all().to_pandas()
+        with np.load(io.BytesIO(body), allow_pickle=False) as f:
+            columns = {name: f[name] for name in f.files}
+    except Exception as e:
+        raise ValueError(f"Unreadable {kind} body: {e}")
+    if any(a.ndim != 1 for a in columns.values()) or len({len(a) for a in columns.values()}) > 1:
+        raise ValueError("Every array must be one column, all of the same length")
+    return pd.DataFrame(columns)
+
+
+def _column_array(series):
+    if series.dtype.kind in 'biuf':
+        return series.to_numpy()
+    # Text and mixed columns as fixed-width unicode, missing values as ''
+    return series.astype(object).where(series.notna(), '').to_numpy(dtype=str)
+
+
+def write_frame(df, kind):
+    """Encode `df` as an NPZ or Arrow body"""
+    buffer = io.BytesIO()
+    if kind == NPZ:
+        np.savez(buffer, **{str(c): _column_array(df[c]) for c in df.columns})
+    elif kind == ARROW:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_stream(buffer, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unsupported media type: {kind}")
+    return buffer.getvalue()
@@ -0,0 +1,147 @@
+"""
+Compact Forests
+Reduced-precision copies of the fitted forests for inference: every tree
+flattened into shared arrays with int16 child indices (int32 once a forest
+has more than 32767 nodes), int16 feature ids, float32 thresholds and
+float32 leaf values. Thresholds are rounded down to the nearest float32,
+which keeps every split identical for the float32 inputs scikit-learn
+compares against, so only the leaf values lose precision. scikit-learn
+numbers nodes depth first, so a left child is always its parent + 1 and
+only right children need storing.
+"""
+
+import os
+
+import numpy as np
+
+from core.forest import is_classifier, leaf_values
+
+COMPACT_DIR = 'models/compact'
+COMPACT_CHUNK = 512     # rows per traversal step; keeps the (rows x trees) node matrix in cache
+
+
+def _floor_float32(values):
+    """Largest float32 <= each float64 value"""
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForest:
+    """
+    A forest's trees in flat arrays, evaluated all trees at once. Leaves
+    have a -inf threshold and point right to themselves, so every row
+    settles on its leaf within max_depth vectorized steps.
+    """
+
+    def __init__(self, right, feature, threshold, value, roots, max_depth, classes=None):
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+
+    @classmethod
+    def from_model(cls, model):
+        classifier = is_classifier(model)
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        index = np.int16 if sizes.sum() <= np.iinfo(np.int16).max else np.int32
+
+        right, feature, threshold, value = [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            if not (leaf | (tree.children_left == nodes + 1)).all():
+                raise ValueError("Tree nodes are not in depth-first order")
+            right.append(np.where(leaf, nodes, tree.children_right) + offset)
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, -np.inf, tree.threshold))
+            value.append(leaf_values(tree, classifier))
+
+        return cls(np.concatenate(right).astype(index),
+                   np.concatenate(feature).astype(np.int16),
+                   _floor_float32(np.concatenate(threshold)),
+                   np.concatenate(value).astype(np.float32),
+                   offsets.astype(index), max(t.max_depth for t in trees),
+                   getattr(model, 'classes_', None))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.right, self.feature, self.threshold, self.value, self.roots))
+
+    def _leaves(self, X):
+        """Leaf node of every tree for each row of X (float32), shape (rows, trees)"""
+        flat = X.ravel()
+        row_start = (np.arange(len(X)) * X.shape[1])[:, None]
+        node = np.repeat(self.roots.astype(np.intp)[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            go_left = flat[row_start + self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, node + 1, self.right[node])
+        return node
+
+    def _mean_values(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.empty((len(X),) + self.value.shape[1:], dtype=np.float64)
+        for start in range(0, len(X), COMPACT_CHUNK):
+            leaves = self._leaves(X[start:start + COMPACT_CHUNK])
+            out[start:start + len(leaves)] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return out
+
+    def predict_proba(self, X):
+        return self._mean_values(X)
+
+    def predict(self, X):
+        values = self._mean_values(X)
+        if self.classes_ is not None:
+            return self.classes_[values.argmax(axis=1)]
+        return values
+
+    # ------------------------------------------
+    # Export
+    # ------------------------------------------
+
+    def save(self, path):
+        arrays = {'right': self.right, 'feature': self.feature,
+                  'threshold': self.threshold, 'value': self.value, 'roots': self.roots,
+                  'max_depth': np.array(self.max_depth)}
+        if self.classes_ is not None:
+            arrays['classes'] = self.classes_
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f['right'], f['feature'], f['threshold'], f['value'], f['roots'],
+                       f['max_depth'], f['classes'] if 'classes' in f else None)
+
+
+def compact_path(key, base='.'):
+    return os.path.join(base, COMPACT_DIR, f"{key}.npz")
+
+
+def export_compact(models, base='.'):
+    """Write a compact copy of each forest in `models` ({key: model}); returns {key: path}"""
+    os.makedirs(os.path.join(base, COMPACT_DIR), exist_ok=True)
+    paths = {}
+    for key, model in models.items():
+        paths[key] = compact_path(key, base)
+        CompactForest.from_model(model).save(paths[key])
+    return paths
+
+
+def forest_nbytes(model):
+    """Bytes held by a scikit-learn forest's node and value arrays"""
+    total = 0
+    for est in model.estimators_:
+        state = est.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
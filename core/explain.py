@@ -0,0 +1,182 @@
+"""
+Prediction Explanations
+Path-dependent TreeSHAP attributions for the forest models: each feature
+gets its Shapley value of the prediction, with features left out of a
+coalition integrated over the training cover of the trees (the
+"tree_path_dependent" method of the shap package). Contributions plus the
+forest's base value add up exactly to the prediction.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from core.forest import LEAF, is_classifier, leaf_values, tree_input
+
+EXPLAIN_BATCH = 20_000
+SHAP_CHUNK = 1_000_000    # (leaf, slot, student) elements per working array
+TOP_DRIVERS = 5
+
+
+class TreeShapExplainer:
+    """
+    Path-dependent TreeSHAP for a whole forest, vectorized over leaves and
+    students. For a leaf with value v whose path splits on k distinct
+    features, feature i's share of v is
+        v * (o_i - z_i) * integral_0^1 prod_{j != i} (z_j (1 - t) + o_j t) dt
+    where z_j is the fraction of the training cover that follows the path's
+    splits on feature j and o_j is 1 if the student follows all of them.
+    The integrand is a polynomial of degree k - 1, so Gauss-Legendre
+    quadrature with ceil(k / 2) nodes is exact. Leaves are grouped by k.
+    """
+
+    def __init__(self, model, n_features):
+        self.classifier = is_classifier(model)
+        self.n_features = n_features
+        self.n_outputs = len(model.classes_) if self.classifier else 1
+        n_trees = len(model.estimators_)
+
+        leaves, base = {}, 0
+        for est in model.estimators_:
+            tree = est.tree_
+            values = leaf_values(tree, self.classifier).reshape(tree.node_count, self.n_outputs)
+            cover = tree.weighted_n_node_samples
+            # The root value is the cover-weighted mean of the leaf values
+            base = base + values[0]
+            stack = [(0, ())]
+            while stack:
+                node, path = stack.pop()
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == LEAF:
+                    if path:
+                        self._add_leaf(leaves, path, values[node] / n_trees)
+                    continue
+                split = (tree.feature[node], tree.threshold[node])
+                stack.append((left, path + (split + (True, cover[left] / cover[node]),)))
+                stack.append((right, path + (split + (False, cover[right] / cover[node]),)))
+
+        self.base = base / n_trees
+        self.groups = [self._group(k, group) for k, group in sorted(leaves.items())]
+
+    @staticmethod
+    def _add_leaf(leaves, path, value):
+        features = list(dict.fromkeys(f for f, _, _, _ in path))
+        slots = [features.index(f) for f, _, _, _ in path]
+        z = np.ones(len(features))
+        for slot, (_, _, _, fraction) in zip(slots, path):
+            z[slot] *= fraction
+        leaves.setdefault(len(features), []).append((features, z, path, slots, value))
+
+    def _group(self, k, group):
+        """Padded arrays for the leaves whose paths split on k distinct features"""
+        L, depth = len(group), max(len(path) for _, _, path, _, _ in group)
+        # Padding splits always pass (x <= inf, going left)
+        feature = np.zeros((L, depth), dtype=np.intp)
+        threshold = np.full((L, depth), np.inf)
+        left = np.ones((L, depth), dtype=bool)
+        slot = np.zeros((L, depth), dtype=np.intp)
+        for l, (_, _, path, slots, _) in enumerate(group):
+            d = len(path)
+            feature[l, :d] = [f for f, _, _, _ in path]
+            threshold[l, :d] = [t for _, t, _, _ in path]
+            left[l, :d] = [goes_left for _, _, goes_left, _ in path]
+            slot[l, :d] = slots
+
+        nodes, weights = np.polynomial.legendre.leggauss((k + 1) // 2)
+        features = np.array([f for f, _, _, _, _ in group]).ravel()
+        return {
+            'k': k,
+            'feature': feature, 'threshold': threshold, 'left': left, 'slot': slot,
+            'z': np.array([z for _, z, _, _, _ in group]),
+            'value': np.array([v for _, _, _, _, v in group]),
+            't': (nodes + 1) / 2,
+            'w': weights / 2,
+            # (leaf, slot) -> feature, to sum slot shares into feature columns
+            'onehot': sparse.csr_matrix((np.ones(len(features)), (features, np.arange(len(features)))),
+                                        shape=(self.n_features, len(features))),
+        }
+
+    def contributions(self, X):
+        """(n x features x outputs) attributions for the rows of X"""
+        X = tree_input(X)
+        n = len(X)
+        out = np.zeros((self.n_features, n, self.n_outputs))
+        for g in self.groups:
+            k, t, w, z = g['k'], g['t'], g['w'], g['z']
+            L = len(z)
+            step = max(1, SHAP_CHUNK // (L * k))
+            for start in range(0, n, step):
+                x = X[start:start + step].T.copy()
+                # o[l, j, m]: whether student m follows every split on slot j of leaf l
+                o = np.ones((L, k, x.shape[1]), dtype=bool)
+                for d in range(g['feature'].shape[1]):
+                    goes_left = x[g['feature'][:, d]] <= g['threshold'][:, d, None]
+                    o[np.arange(L), g['slot'][:, d]] &= goes_left == g['left'][:, d, None]
+                o = o.astype(float)
+
+                # Quadrature over t of prod_{j != i} (z_j (1 - t) + o_j t), one node at a time
+                share = np.zeros_like(o)
+                for t_q, w_q in zip(t, w):
+                    factors = o * t_q
+                    factors += z[:, :, None] * (1 - t_q)
+                    share += w_q * factors.prod(axis=1, keepdims=True) / factors
+                share *= o - z[:, :, None]
+                share = share[..., None] * g['value'][:, None, None, :]
+                rows = slice(start, start + x.shape[1])
+                out[:, rows] += (g['onehot'] @ share.reshape(L * k, -1)).reshape(self.n_features, x.shape[1], -1)
+        return out.transpose(1, 0, 2)
+
+
+class Attributions:
+    """Per-student feature contributions to one model's output"""
+
+    def __init__(self, values, base, features, label=None):
+        self.values = values            # (n_students x features), float32
+        self.base = base                # per-student base value
+        self.features = list(features)
+        self.label = label              # explained class per student (classifiers)
+
+    def row(self, pos):
+        return pd.Series(self.values[pos], index=self.features)
+
+    def top(self, pos, k=TOP_DRIVERS):
+        """The k largest contributions by magnitude, largest first"""
+        row = self.row(pos)
+        return row.reindex(row.abs().sort_values(ascending=False).index[:k])
+
+
+def explain_model(model, X, features, batch=EXPLAIN_BATCH):
+    """
+    Attributions for every row of X. Regressors explain the predicted value;
+    classifiers explain the probability of each row's predicted class.
+    """
+    explainer = TreeShapExplainer(model, len(features))
+    n = len(X)
+    values = np.empty((n, len(features)), dtype=np.float32)
+    label = np.empty(n, dtype=int) if explainer.classifier else None
+
+    for start in range(0, n, batch):
+        part = explainer.contributions(X[start:start + batch])
+        rows = slice(start, start + len(part))
+        if explainer.classifier:
+            # Predicted class = argmax of base + summed contributions
+            idx = (explainer.base + part.sum(axis=1)).argmax(axis=1)
+            label[rows] = idx
+            values[rows] = part[np.arange(len(part)), :, idx]
+        else:
+            values[rows] = part[:, :, 0]
+
+    base = explainer.base[label] if explainer.classifier else np.full(n, explainer.base[0])
+    return Attributions(values, base, features, label)
+
+
+def explain_cohort(X, models):
+    """Risk and graduation attributions for a scored feature matrix"""
+    return {
+        'risk': explain_model(models['risk'], X, models['features']),
+        'grad': explain_model(models['grad'], X, models['features']),
+    }
+
+
+def feature_label(feature):
+    return feature.replace('_', ' ').title()
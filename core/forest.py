@@ -0,0 +1,32 @@
+"""
+Forest Internals
+Plain-array views of fitted scikit-learn tree ensembles
+"""
+
+import numpy as np
+
+LEAF = -1
+
+
+def is_classifier(model):
+    return hasattr(model, 'classes_')
+
+
+def leaf_values(tree, classifier):
+    """
+    Per-node output: class probabilities (rows sum to 1) for classifiers,
+    the predicted value for regressors
+    """
+    value = tree.value[:, 0, :]
+    if classifier:
+        totals = value.sum(axis=1, keepdims=True)
+        return value / np.where(totals == 0, 1, totals)
+    return value[:, 0]
+
+
+def tree_input(X):
+    """
+    Inputs rounded to float32 like scikit-learn does, but held as float64 so
+    comparisons against the float64 thresholds match its predictions
+    """
+    return np.asarray(X, dtype=np.float32).astype(np.float64)
@@ -0,0 +1,179 @@
+"""
+Prediction History
+Append-only snapshots of the cohort's predictions, one per scoring run,
+partitioned by date: data/history/date=YYYY-MM-DD/run-<time>/ holds one
+.npy file per column (rows sorted by student_id) and a meta.json with the
+run's cohort summary. Date ranges only open the matching partitions,
+per-student lookups memory-map the columns and binary-search the id, and
+cohort trends read nothing but meta.json.
+"""
+
+from datetime import datetime, date
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from core.aggregates import RISK_LABELS, AT_RISK_THRESHOLD, risk_categories
+
+HISTORY_DIR = 'data/history'
+HISTORY_COLUMNS = ['student_id', 'risk', 'grad', 'grad_conf']
+
+
+def _day(value):
+    """date from a date, datetime or 'YYYY-MM-DD' string (None passes through)"""
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+class SnapshotStore:
+    """Date-partitioned, append-only store of prediction snapshots"""
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    # ------------------------------------------
+    # Writes
+    # ------------------------------------------
+
+    def append(self, predictions, when=None, source=None):
+        """
+        Record one scoring run (student_id, grad, grad_conf, risk per student).
+        Written to a temporary directory and renamed into place, so readers
+        never see a partial run. Returns the run directory.
+        """
+        when = when or datetime.now()
+        order = np.argsort(predictions['student_id'].to_numpy(dtype=str), kind='stable')
+        preds = predictions.iloc[order]
+        ids = preds['student_id'].to_numpy(dtype=str)
+        risk = preds['risk'].to_numpy(dtype=np.float32)
+        labels, grad = np.unique(preds['grad'].astype(str).to_numpy(), return_inverse=True)
+        cats = risk_categories(risk)
+
+        meta = {
+            'scored_at': when.isoformat(timespec='milliseconds'),
+            'source': source,
+            'students': int(len(preds)),
+            'grad_labels': labels.tolist(),
+            'risk_mean': float(risk.mean()) if len(risk) else 0.0,
+            'at_risk': int((risk > AT_RISK_THRESHOLD).sum()),
+            'risk_counts': np.bincount(cats[cats >= 0], minlength=len(RISK_LABELS)).tolist(),
+            'grad_counts': np.bincount(grad, minlength=len(labels)).tolist(),
+        }
+
+        partition = os.path.join(self.root, f"date={when.date().isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+        name = f"run-{when.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        tmp = os.path.join(partition, f".{name}.tmp")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'student_id.npy'), ids)
+        np.save(os.path.join(tmp, 'risk.npy'), risk)
+        np.save(os.path.join(tmp, 'grad.npy'), grad.astype(np.int16))
+        np.save(os.path.join(tmp, 'grad_conf.npy'), preds['grad_conf'].to_numpy(dtype=np.float32))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        run = os.path.join(partition, name)
+        os.rename(tmp, run)
+        return run
+
+    # ------------------------------------------
+    # Reads
+    # ------------------------------------------
+
+    def partitions(self, start=None, end=None):
+        """Partition dates within [start, end], oldest first (directory names only)"""
+        if not os.path.isdir(self.root):
+            return []
+        start, end = _day(start), _day(end)
+        days = []
+        for name in os.listdir(self.root):
+            if not name.startswith('date='):
+                continue
+            day = date.fromisoformat(name[5:])
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.append(day)
+        return sorted(days)
+
+    def runs(self, start=None, end=None):
+        """(run directory, meta) for every completed run in the date range, oldest first"""
+        out = []
+        for day in self.partitions(start, end):
+            partition = os.path.join(self.root, f"date={day.isoformat()}")
+            for name in os.listdir(partition):
+                if not name.startswith('run-'):
+                    continue
+                with open(os.path.join(partition, name, 'meta.json')) as f:
+                    out.append((os.path.join(partition, name), json.load(f)))
+        return sorted(out, key=lambda run: run[1]['scored_at'])
+
+    def latest(self):
+        """Meta of the most recent run, or None"""
+        days = self.partitions()
+        runs = self.runs(start=days[-1]) if days else []
+        return runs[-1][1] if runs else None
+
+    def cohort_trend(self, start=None, end=None):
+        """One row per run: time, students, mean risk, at-risk count and risk category counts"""
+        rows = []
+        for _, meta in self.runs(start, end):
+            row = {'scored_at': pd.Timestamp(meta['scored_at']), 'students': meta['students'],
+                   'risk_mean': meta['risk_mean'], 'at_risk': meta['at_risk']}
+            row.update(dict(zip(RISK_LABELS, meta['risk_counts'])))
+            rows.append(row)
+        return pd.DataFrame(rows, columns=['scored_at', 'students', 'risk_mean', 'at_risk'] + RISK_LABELS)
+
+    def students_history(self, student_ids, start=None, end=None):
+        """
+        Long table (student_id, scored_at, risk, grad, grad_conf) for the given
+        students across the runs in range; absent students are skipped per run
+        """
+        wanted = np.asarray(list(student_ids), dtype=str)
+        parts = {'student_id': [], 'scored_at': [], 'risk': [], 'grad': [], 'grad_conf': []}
+        for run, meta in self.runs(start, end):
+            ids = np.load(os.path.join(run, 'student_id.npy'), mmap_mode='r')
+            if not len(ids):
+                continue
+            pos = np.minimum(np.searchsorted(ids, wanted), len(ids) - 1)
+            found = ids[pos] == wanted
+            if not found.any():
+                continue
+            pos = pos[found]
+            parts['student_id'].append(wanted[found])
+            parts['scored_at'].append(np.full(len(pos), np.datetime64(meta['scored_at'], 'ms')))
+            parts['risk'].append(np.load(os.path.join(run, 'risk.npy'), mmap_mode='r')[pos])
+            codes = np.load(os.path.join(run, 'grad.npy'), mmap_mode='r')[pos]
+            parts['grad'].append(np.asarray(meta['grad_labels'])[codes])
+            parts['grad_conf'].append(np.load(os.path.join(run, 'grad_conf.npy'), mmap_mode='r')[pos])
+        if not parts['student_id']:
+            return pd.DataFrame(columns=list(parts))
+        # One frame at the end: per-run DataFrames would dominate the cost
+        history = pd.DataFrame({col: np.concatenate(values) for col, values in parts.items()})
+        history[['risk', 'grad_conf']] = history[['risk', 'grad_conf']].astype(float)
+        return history
+
+    def student_history(self, student_id, start=None, end=None):
+        """One student's predictions over time, oldest first"""
+        return self.students_history([student_id], start, end).drop(columns='student_id')
+
+
+def snapshot_if_new(history, predictions, fp, when=None, min_interval=None):
+    """
+    Append a run unless the latest run already has this fingerprint, so
+    reloading the same data and models does not record duplicate snapshots.
+    With `min_interval` (a timedelta), also skip if the latest run is more
+    recent than that, so a stream of small updates records one run per
+    interval rather than one per update.
+    """
+    latest = history.latest()
+    if latest is not None and latest.get('source') == fp:
+        return None
+    when = when or datetime.now()
+    if latest is not None and min_interval is not None \
+            and when - datetime.fromisoformat(latest['scored_at']) < min_interval:
+        return None
+    return history.append(predictions, when=when, source=fp)
@@ -0,0 +1,139 @@
+"""
+Cohort Indexes
+Precomputed lookup structures built once at load time
+"""
+
+import numpy as np
+
+
+class PercentileIndex:
+    """Pre-sorted value arrays per metric for O(log n) percentile and rank lookups"""
+    
+    def __init__(self, data, columns):
+        self.sorted = {}
+        for col in columns:
+            if col in data.columns:
+                values = data[col].to_numpy(dtype=float)
+                self.sorted[col] = np.sort(values[~np.isnan(values)])
+        self.total = len(data)
+    
+    @property
+    def columns(self):
+        return list(self.sorted)
+    
+    def percentile(self, column, value):
+        """Share of students strictly below `value` (0-100)"""
+        values = self.sorted[column]
+        if len(values) == 0:
+            return 0.0
+        below = np.searchsorted(values, value, side='left')
+        return below / len(values) * 100
+    
+    def rank(self, column, value):
+        """1-based rank, highest value first (ties share the best rank)"""
+        values = self.sorted[column]
+        above = len(values) - np.searchsorted(values, value, side='right')
+        return above + 1 if np.ndim(above) else int(above) + 1
+    
+    def with_changes(self, removed, added):
+        """
+        New index with the rows of `removed` taken out and the rows of `added`
+        put in (both DataFrames), merged into the sorted arrays without re-sorting
+        """
+        index = PercentileIndex.__new__(PercentileIndex)
+        index.sorted = {}
+        for col, values in self.sorted.items():
+            out = removed[col].to_numpy(dtype=float) if col in removed else np.array([])
+            out = np.sort(out[~np.isnan(out)])
+            if len(out):
+                # Equal values take consecutive slots: offset each by its rank among equals
+                first = np.searchsorted(out, out, side='left')
+                pos = np.searchsorted(values, out, side='left') + np.arange(len(out)) - first
+                values = np.delete(values, pos)
+            new = added[col].to_numpy(dtype=float) if col in added else np.array([])
+            new = np.sort(new[~np.isnan(new)])
+            index.sorted[col] = np.insert(values, np.searchsorted(values, new), new)
+        index.total = self.total - len(removed) + len(added)
+        return index
+    
+    def percentiles(self, student, columns=None):
+        """Percentile of a student (Series or dict) on every indexed metric"""
+        columns = columns or self.columns
+        return {c: self.percentile(c, student.get(c, 0)) for c in columns}
+
+
+class StudentIndex:
+    """Hash index from student_id to row position"""
+    
+    def __init__(self, data):
+        ids = data['student_id'].to_numpy()
+        self.positions = dict(zip(ids, range(len(ids))))
+    
+    def __contains__(self, student_id):
+        return student_id in self.positions
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    def with_added(self, ids):
+        """New index with `ids` appended after the existing rows"""
+        index = StudentIndex.__new__(StudentIndex)
+        index.positions = dict(self.positions)
+        for sid in ids:
+            index.positions[sid] = len(index.positions)
+        return index
+    
+    def position(self, student_id):
+        """Row position of `student_id`, or None if unknown"""
+        return self.positions.get(student_id)
+    
+    def lookup(self, data, student_id):
+        """Row of `data` for `student_id` in O(1)"""
+        pos = self.positions.get(student_id)
+        if pos is None:
+            raise KeyError(student_id)
+        return data.iloc[pos]
+
+
+class PrefixIndex:
+    """
+    Sorted-key prefix index over student_id and name.
+    Every name token is indexed too, so "sharma" finds "Rahul Sharma".
+    """
+    
+    def __init__(self, data):
+        ids = data['student_id'].astype(str).str.lower().to_numpy()
+        names = data['name'].astype(str).str.lower()
+        n = len(data)
+        
+        keys = [ids, names.to_numpy()]
+        positions = [np.arange(n), np.arange(n)]
+        # Later name tokens (surnames); the first token is covered by the full name
+        tokens = names.str.split().str[1:].explode().dropna()
+        keys.append(tokens.to_numpy(dtype=str))
+        positions.append(tokens.index.to_numpy())
+        
+        keys = np.concatenate([np.asarray(k, dtype=str) for k in keys])
+        positions = np.concatenate(positions)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = positions[order]
+        self.total = n
+    
+    def search(self, query, k=20):
+        """Row positions of up to `k` students whose ID or name starts with `query`"""
+        query = (query or '').strip().lower()
+        if not query:
+            return list(range(min(k, self.total)))
+        
+        lo = np.searchsorted(self.keys, query, side='left')
+        hi = np.searchsorted(self.keys, query + '￿', side='left')
+        
+        matches, seen = [], set()
+        for pos in self.positions[lo:hi]:
+            if pos not in seen:
+                seen.add(pos)
+                matches.append(int(pos))
+                if len(matches) == k:
+                    break
+        return matches
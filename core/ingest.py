@@ -0,0 +1,184 @@
+"""
+Incremental Rescoring
+Ingests new or updated student records into the store, rescores only the
+students whose records changed, and lets an already loaded cohort catch up
+with those changes without rebuilding its predictions, aggregates,
+percentile index, similarity index or validation report
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.aggregates import update_aggregates
+from core.schema import check, validate, FIELD_RANGES, FIELD_VALUES
+from core.scoring import score_cohort, build_feature_matrix
+from core.store import PREDICTION_COLUMNS
+
+
+def ingest(store, models, records, now=None):
+    """
+    Upsert `records` (DataFrame with student_id plus any columns to set),
+    rescore the inserted and changed students and save their predictions.
+    Updates may carry any subset of columns, but a new student needs a
+    value for every stored model feature and schema column. Raises
+    SchemaError, before anything is written, if a value is invalid or a
+    new student is incomplete.
+    """
+    start = time.perf_counter()
+    existing = store.students(records['student_id'], ['student_id'])['student_id']
+    check(records, required=required_columns(store, models),
+          required_rows=~records['student_id'].isin(existing).to_numpy())
+    inserted, updated = store.upsert(records, now)
+    changed = inserted + updated
+    if changed:
+        store.write_predictions(score_cohort(store.students(changed), models), now)
+    return {
+        'received': len(records),
+        'inserted': len(inserted),
+        'updated': len(updated),
+        'unchanged': records['student_id'].nunique() - len(changed),
+        'rescored': len(changed),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def required_columns(store, models):
+    """Stored columns a new student must have: the model features and every schema field"""
+    features = set(models['features'])
+    return [c for c in store.columns()
+            if c in features or c in FIELD_RANGES or c in FIELD_VALUES]
+
+
+class LiveCohort:
+    """
+    A loaded cohort with its predictions, aggregates, percentile index,
+    student index and validation report, kept current by applying the
+    store's change log. Each refresh swaps in new objects, so readers never
+    see a half update. `predictions` and `percentiles` may instead be
+    builders, called with (fp, data) on first access; until then refreshes
+    leave them alone. The validation report is always built that way, and a
+    refresh revalidates only the changed rows. An optional `similarity`
+    builder works the same way; once built, that index is patched in place
+    with upsert() (it locks its own updates).
+    """
+
+    def __init__(self, fp, data, predictions, aggregates, percentiles, students,
+                 store=None, models=None, preserve=('name',), similarity=None):
+        self.base_fp = fp
+        self.data = data
+        self._predictions = predictions
+        self.aggregates = aggregates
+        self._percentiles = percentiles
+        self._validation = lambda fp, data: validate(data)
+        self._similarity = similarity
+        self.students = students
+        self.store = store
+        self.models = models
+        self.preserve = [c for c in preserve if c in data.columns]
+        self.seq = store.last_change() if store is not None else 0
+        self.version = 0
+        self.applied = 0
+        self._lock = threading.RLock()
+
+    @property
+    def fp(self):
+        """Fingerprint for derived caches: changes whenever a refresh applies updates"""
+        return self.base_fp if self.version == 0 else f"{self.base_fp}.{self.version}"
+
+    def _built(self, name):
+        return not callable(getattr(self, name))
+
+    def _build(self, name):
+        with self._lock:
+            if not self._built(name):
+                setattr(self, name, getattr(self, name)(self.fp, self.data))
+            return getattr(self, name)
+
+    @property
+    def predictions(self):
+        return self._build('_predictions')
+
+    @property
+    def percentiles(self):
+        return self._build('_percentiles')
+
+    @property
+    def similarity(self):
+        return self._build('_similarity')
+
+    @property
+    def validation(self):
+        return self._build('_validation')
+
+    @property
+    def predictions_built(self):
+        return self._built('_predictions')
+
+    def built(self, name):
+        """Whether 'predictions', 'percentiles', 'similarity' or 'validation' has been built yet"""
+        return self._built('_' + name)
+
+    def refresh(self):
+        """Apply store changes made since the last refresh; returns the number of students applied"""
+        if self.store is None:
+            return 0
+        with self._lock:
+            ids, seq = self.store.changes_since(self.seq)
+            if not ids:
+                return 0
+            rows = self.store.students(ids).reindex(columns=self.data.columns)
+            scored = self._built('_predictions')
+
+            pos = rows['student_id'].map(self.students.positions)
+            known = pos.notna().to_numpy()
+            index = self.data.index[pos[known].astype(int)]
+            old = self.data.loc[index]
+            updated = rows[known].set_axis(index)
+            for col in self.preserve:
+                updated[col] = old[col]
+            new = rows[~known]
+            new = new.set_axis(pd.RangeIndex(len(self.data), len(self.data) + len(new)))
+
+            data = self.data.copy()
+            for col in data.columns:
+                data.loc[index, col] = updated[col].to_numpy()
+            if len(new):
+                data = pd.concat([data, new])
+            predictions = self._predictions
+            if scored:
+                preds = self._predictions_for(rows)
+                predictions = self._predictions.copy()
+                for col in PREDICTION_COLUMNS:
+                    predictions.loc[index, col] = preds.loc[updated['student_id'], col].to_numpy()
+                if len(new):
+                    new_preds = preds.loc[new['student_id']].reset_index().set_axis(new.index)
+                    predictions = pd.concat([predictions, new_preds[predictions.columns]])
+
+            added = pd.concat([updated, new])
+            self.aggregates = update_aggregates(self.aggregates, old, added, data)
+            if self._built('_percentiles'):
+                self._percentiles = self._percentiles.with_changes(old, added)
+            if self._built('_validation'):
+                positions = np.concatenate([pos[known].astype(int).to_numpy(), np.arange(len(self.data), len(data))])
+                self._validation = self._validation.with_rows(positions, validate(added), len(data))
+            if self._built('_similarity') and self._similarity is not None:
+                self._similarity.upsert(build_feature_matrix(added, self.models['features']),
+                                        added['student_id'].to_numpy())
+            self.students = self.students.with_added(new['student_id'])
+            self.data, self._predictions = data, predictions
+            self.seq = seq
+            self.version += 1
+            self.applied += len(ids)
+            return len(ids)
+
+    def _predictions_for(self, rows):
+        """Stored predictions for `rows`, scoring any the store does not have yet"""
+        preds = self.store.read_predictions(rows['student_id']).set_index('student_id')[PREDICTION_COLUMNS]
+        missing = rows[~rows['student_id'].isin(preds.index)]
+        if len(missing) and self.models is not None:
+            scored = score_cohort(missing, self.models).set_index('student_id')[PREDICTION_COLUMNS]
+            preds = pd.concat([preds, scored])
+        return preds
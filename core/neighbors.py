@@ -0,0 +1,145 @@
+"""
+Similar Students
+Nearest-neighbour search over the standardized model features, by a
+float32 scan of the whole cohort (with this many features a KD-tree prunes
+too little to beat it). The main index is built once per cohort; students added or changed afterwards go to
+a small buffer that is searched by brute force and folded into a rebuilt
+index once it grows past a fraction of the cohort. Updates happen in
+place under a lock, so a shared index can be patched while it is queried.
+"""
+
+import threading
+
+import numpy as np
+
+SIMILAR_K = 5
+REBUILD_FRACTION = 0.05   # rebuild once buffered + retired rows exceed this share
+RERANK = 4                # scan candidates per neighbour re-ranked by direct distance
+
+
+class SimilarityIndex:
+    """
+    k most similar students for any student or hypothetical profile. The
+    standardized features are stored as float32; a matrix-vector scan picks
+    k * RERANK candidates, which are ranked by their directly computed
+    distance, so results are exact up to float32 rounding of the features.
+    """
+
+    def __init__(self, X, ids, rebuild_fraction=REBUILD_FRACTION):
+        X = np.asarray(X, dtype=float)
+        self.mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        self.scale = np.where(std > 0, std, 1.0)
+        self.rebuild_fraction = rebuild_fraction
+        self.rebuilds = 0
+        self._lock = threading.RLock()
+        self._fit(self.transform(X), np.asarray(ids))
+
+    def _fit(self, Z, ids):
+        self.ids = ids
+        self.rows = {sid: i for i, sid in enumerate(ids.tolist())}
+        self.dead = np.zeros(len(ids), dtype=bool)
+        self.n_dead = 0
+        self.delta = {}            # student_id -> standardized row, not yet indexed
+        self.Z = np.ascontiguousarray(Z, dtype=np.float32)
+        self.norms = np.einsum('ij,ij->i', self.Z, self.Z)
+
+    def transform(self, X):
+        """Standardize with the cohort mean/std the index was built with"""
+        return (np.asarray(X, dtype=float) - self.mean) / self.scale
+
+    def __len__(self):
+        return len(self.ids) - self.n_dead + len(self.delta)
+
+    def __contains__(self, student_id):
+        return student_id in self.delta or (student_id in self.rows and not self.dead[self.rows[student_id]])
+
+    # ------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------
+
+    def _retire(self, student_id):
+        row = self.rows.get(student_id)
+        if row is not None and not self.dead[row]:
+            self.dead[row] = True
+            self.n_dead += 1
+            self.norms[row] = np.inf
+
+    def upsert(self, X, ids):
+        """Add new students or replace the features of existing ones"""
+        with self._lock:
+            for sid, z in zip(ids, self.transform(np.atleast_2d(X))):
+                self._retire(sid)
+                self.delta[sid] = z
+            self._maybe_rebuild()
+
+    def remove(self, ids):
+        with self._lock:
+            for sid in ids:
+                self._retire(sid)
+                self.delta.pop(sid, None)
+            self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        if len(self.delta) + self.n_dead > self.rebuild_fraction * max(len(self.ids), 1):
+            self.rebuild()
+
+    def rebuild(self):
+        """Fold the buffer into a new index (the scaling is kept fixed)"""
+        with self._lock:
+            live = ~self.dead
+            Z, ids = np.asarray(self.Z[live], dtype=float), self.ids[live]
+            if self.delta:
+                Z = np.vstack([Z, np.array(list(self.delta.values()))])
+                ids = np.concatenate([ids, np.array(list(self.delta), dtype=ids.dtype)])
+            self._fit(Z, ids)
+            self.rebuilds += 1
+
+    # ------------------------------------------
+    # Queries
+    # ------------------------------------------
+
+    def _search(self, z, k):
+        """(rows, distances) of the k nearest live rows of the main index"""
+        # |a - b|^2 = |a|^2 - 2ab + |b|^2; retired rows have an infinite norm.
+        # The expansion loses precision, so candidates are re-ranked by |a - b| itself
+        scores = self.norms - 2 * (self.Z @ z.astype(np.float32))
+        m = min(len(scores), k * RERANK)
+        cand = np.argpartition(scores, m - 1)[:m] if m < len(scores) else np.arange(len(scores))
+        cand = cand[np.isfinite(self.norms[cand])]
+        dist = np.sqrt(((self.Z[cand].astype(float) - z) ** 2).sum(axis=1))
+        order = np.argsort(dist, kind='stable')[:k]
+        return cand[order], dist[order]
+
+    def query(self, x, k=SIMILAR_K, exclude=None):
+        """
+        (student_ids, distances) of the k nearest students to feature vector `x`,
+        nearest first. `exclude` drops one student_id (usually the student asked about).
+        """
+        z = self.transform(np.asarray(x, dtype=float).ravel())
+        fetch = k + (exclude is not None)
+        with self._lock:
+            rows, dist = self._search(z, fetch)
+            ids = self.ids[rows]
+
+            if self.delta:
+                delta_ids = np.array(list(self.delta), dtype=self.ids.dtype)
+                delta_dist = np.sqrt(((np.array(list(self.delta.values())) - z) ** 2).sum(axis=1))
+                ids = np.concatenate([ids, delta_ids])
+                dist = np.concatenate([dist, delta_dist])
+                order = np.argsort(dist, kind='stable')
+                ids, dist = ids[order], dist[order]
+
+        if exclude is not None:
+            keep = ids != exclude
+            ids, dist = ids[keep], dist[keep]
+        return ids[:k], dist[:k]
+
+    def similar_to(self, student_id, k=SIMILAR_K):
+        """Nearest neighbours of an indexed student, excluding the student"""
+        with self._lock:
+            if student_id in self.delta:
+                z = self.delta[student_id]
+            else:
+                z = np.asarray(self.Z[self.rows[student_id]], dtype=float)
+        return self.query(z * self.scale + self.mean, k=k, exclude=student_id)
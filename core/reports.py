@@ -0,0 +1,188 @@
+"""
+Student Reports
+Text report rendering, plus bulk export across a process pool into a streamed ZIP
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import io
+import os
+import zipfile
+
+import pandas as pd
+
+from core.trajectory import N_SEMESTERS, SEMESTER_LABELS
+from core.rules import ACHIEVEMENT_RULES, evaluate_rules, matching
+
+
+# Semester-wise Progress (real sem1..sem8 data)
+def gen_progress(student):
+    sems = range(1, N_SEMESTERS + 1)
+    return pd.DataFrame({
+        'Semester': [label.replace('\n', ' ') for label in SEMESTER_LABELS],
+        'CGPA': [student.get(f'sem{i}_cgpa', float('nan')) for i in sems],
+        'Attendance': [student.get(f'sem{i}_attendance', float('nan')) for i in sems],
+        'Backlogs': [int(student.get(f'sem{i}_backlogs', 0)) for i in sems],
+    })
+
+def gen_trend(trend):
+    """Risk trend section from a student's prediction history (empty without one)"""
+    if trend is None:
+        return ''
+    if len(trend) == 0:
+        body = 'No earlier scoring runs recorded'
+    else:
+        table = pd.DataFrame({
+            'Scored': pd.to_datetime(trend['scored_at']).dt.strftime('%Y-%m-%d %H:%M'),
+            'Risk': trend['risk'].map('{:.1f}'.format),
+            'Graduation': trend['grad'],
+        })
+        change = trend['risk'].iloc[-1] - trend['risk'].iloc[0]
+        body = f"{table.to_string(index=False)}\nChange since first run: {change:+.1f}"
+    return f"""
+📉 RISK TREND (Prediction History)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{body}
+"""
+
+# Report Generator
+def gen_report(student, pred, prog_df, ach, peer, trend=None):
+    return f"""
+╔═══════════════════════════════════════════════════════════╗
+║      COMPREHENSIVE STUDENT PERFORMANCE REPORT             ║
+╚═══════════════════════════════════════════════════════════╝
+
+STUDENT: {student['name']} ({student['student_id']})
+DATE: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+📊 ACADEMIC PERFORMANCE
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CGPA: {student['overall_cgpa']:.2f}
+Attendance: {student.get('overall_attendance', 0):.1f}%
+Backlogs: {int(student.get('current_backlogs', 0))}
+Coding Score: {student.get('coding_test_score', 0):.0f}/100
+
+🎯 AI PREDICTIONS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Graduation: {pred['grad']} ({pred['grad_conf']:.1f}% confidence)
+Risk Score: {pred['risk']:.1f}/100
+Status: {'CRITICAL' if pred['risk'] > 70 else 'HIGH' if pred['risk'] > 50 else 'MODERATE'}
+
+📈 PROGRESS (Semester-wise)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{prog_df.to_string(index=False)}
+{gen_trend(trend)}
+🏆 ACHIEVEMENTS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{chr(10).join([f"{a['icon']} {a['title']}" for a in ach]) if ach else 'No achievements yet'}
+
+👥 PEER COMPARISON
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Rank: {peer['rank']}/{peer['total']}
+CGPA Percentile: {peer['cgpa_pct']:.1f}%
+Attendance Percentile: {peer['att_pct']:.1f}%
+
+🎯 RECOMMENDATIONS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{f"⚠️ CRITICAL: Immediate intervention required!" if pred['risk'] > 70 else f"Focus on improving CGPA to 7.0+" if student['overall_cgpa'] < 6.5 else "Maintain excellence!"}
+
+═══════════════════════════════════════════════════════════
+Generated by Student Performance Analysis- an AI Powered System 
+"""
+
+
+# ==========================================
+# BULK EXPORT
+# ==========================================
+
+REPORT_CHUNK_SIZE = 250
+EMPTY_TREND = pd.DataFrame(columns=['scored_at', 'risk', 'grad', 'grad_conf'])
+
+
+def report_filename(student_id):
+    return f"Report_{student_id}_{datetime.now().strftime('%Y%m%d')}.txt"
+
+
+def build_report_inputs(students, predictions, index, history=None):
+    """
+    (student, pred, peer, achievements, trend) for every row of `students`,
+    using the precomputed predictions and percentile index, the achievement
+    rule masks and, with a `history`, the prediction trend (all looked up
+    in bulk)
+    """
+    cgpa = students['overall_cgpa'].to_numpy(dtype=float)
+    cgpa_pct = index.percentile('overall_cgpa', cgpa)
+    att_pct = index.percentile('overall_attendance', students['overall_attendance'].to_numpy(dtype=float))
+    ranks = index.rank('overall_cgpa', cgpa)
+    preds = predictions.loc[students.index, ['grad', 'grad_conf', 'risk']].to_dict('records')
+    ach_mask = evaluate_rules(students, ACHIEVEMENT_RULES).to_numpy()
+    trends = {}
+    if history is not None:
+        trends = dict(tuple(history.students_history(students['student_id']).groupby('student_id')))
+    
+    inputs = []
+    for i, student in enumerate(students.to_dict('records')):
+        peer = {'rank': int(ranks[i]), 'total': index.total,
+                'cgpa_pct': float(cgpa_pct[i]), 'att_pct': float(att_pct[i])}
+        trend = trends.get(student['student_id'], EMPTY_TREND) if history is not None else None
+        inputs.append((student, preds[i], peer, matching(ACHIEVEMENT_RULES, ach_mask[i]), trend))
+    return inputs
+
+
+def render_reports(inputs):
+    """Render a chunk of (student, pred, peer, achievements, trend) inputs into (filename, text) pairs"""
+    return [(report_filename(student['student_id']),
+             gen_report(student, pred, gen_progress(student), ach, peer, trend))
+            for student, pred, peer, ach, trend in inputs]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target; ZipFile then streams entries with data descriptors"""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _rendered_chunks(inputs, workers):
+    chunks = [inputs[i:i + REPORT_CHUNK_SIZE] for i in range(0, len(inputs), REPORT_CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield render_reports(chunk)
+        return
+    
+    # Keep a bounded window of chunks in flight so memory stays flat
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(render_reports, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def stream_reports_zip(inputs, workers=None):
+    """
+    Render reports across a process pool and yield the ZIP archive as byte
+    chunks, so the whole archive is never held in memory
+    """
+    workers = workers or os.cpu_count() or 1
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for rendered in _rendered_chunks(inputs, workers):
+            for filename, text in rendered:
+                zf.writestr(filename, text)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,98 @@
+"""
+Rules Engine
+Declarative achievement and resource rules, evaluated as boolean masks
+over the whole cohort in one pass
+"""
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+OPS = {
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+    '==': operator.eq, '!=': operator.ne,
+}
+
+# A rule matches when every (column, op, value) condition in 'when' holds.
+# An empty 'when' always matches. Missing columns read as 0.
+
+ACHIEVEMENT_RULES = [
+    {'id': 'outstanding_scholar', 'icon': '🏆', 'title': 'Outstanding Scholar', 'class': 'badge-gold',
+     'when': [('overall_cgpa', '>=', 9.0)]},
+    {'id': 'excellent_student', 'icon': '⭐', 'title': 'Excellent Student', 'class': 'badge-silver',
+     'when': [('overall_cgpa', '>=', 8.0), ('overall_cgpa', '<', 9.0)]},
+    {'id': 'perfect_attendance', 'icon': '📅', 'title': 'Perfect Attendance', 'class': 'badge-gold',
+     'when': [('overall_attendance', '>=', 95)]},
+    {'id': 'zero_backlogs', 'icon': '🎯', 'title': 'Zero Backlogs', 'class': 'badge-gold',
+     'when': [('current_backlogs', '==', 0)]},
+    {'id': 'coding_master', 'icon': '💻', 'title': 'Coding Master', 'class': 'badge-gold',
+     'when': [('coding_test_score', '>=', 85)]},
+]
+
+RESOURCE_RULES = [
+    {'id': 'nptel', 'icon': '📚', 'name': 'NPTEL', 'desc': 'IIT video lectures',
+     'link': 'nptel.ac.in', 'priority': 'HIGH', 'when': [('overall_cgpa', '<', 6.5)]},
+    {'id': 'khan_academy', 'icon': '📖', 'name': 'Khan Academy', 'desc': 'Math & Science basics',
+     'link': 'khanacademy.org', 'priority': 'HIGH', 'when': [('overall_cgpa', '<', 6.5)]},
+    {'id': 'leetcode', 'icon': '💻', 'name': 'LeetCode', 'desc': 'Coding practice',
+     'link': 'leetcode.com', 'priority': 'HIGH', 'when': [('coding_test_score', '<', 70)]},
+    {'id': 'hackerrank', 'icon': '🚀', 'name': 'HackerRank', 'desc': 'Programming challenges',
+     'link': 'hackerrank.com', 'priority': 'HIGH', 'when': [('coding_test_score', '<', 70)]},
+    {'id': 'geeksforgeeks', 'icon': '📚', 'name': 'GeeksforGeeks', 'desc': 'DSA tutorials',
+     'link': 'geeksforgeeks.org', 'priority': 'HIGH', 'when': [('coding_test_score', '<', 70)]},
+    {'id': 'coursera', 'icon': '🎓', 'name': 'Coursera', 'desc': 'Professional courses',
+     'link': 'coursera.org', 'priority': 'MED', 'when': []},
+    {'id': 'edx', 'icon': '📝', 'name': 'edX', 'desc': 'University courses',
+     'link': 'edx.org', 'priority': 'MED', 'when': []},
+]
+
+
+def evaluate_rules(df, rules):
+    """Boolean DataFrame (students x rules), one column per rule id"""
+    columns = {}
+    cache = {}
+    for rule in rules:
+        mask = np.ones(len(df), dtype=bool)
+        for col, op, value in rule['when']:
+            if col not in cache:
+                cache[col] = df[col].to_numpy() if col in df.columns else np.zeros(len(df))
+            mask &= OPS[op](cache[col], value)
+        columns[rule['id']] = mask
+    return pd.DataFrame(columns, index=df.index)
+
+
+def matching(rules, mask_row):
+    """Rules whose mask is True in `mask_row`, in table order"""
+    return [rule for rule, hit in zip(rules, mask_row) if hit]
+
+
+class RuleBook:
+    """Precomputed achievement and resource masks for a cohort"""
+
+    def __init__(self, data):
+        self.achievement_mask = evaluate_rules(data, ACHIEVEMENT_RULES)
+        self.resource_mask = evaluate_rules(data, RESOURCE_RULES)
+        self._ach = self.achievement_mask.to_numpy()
+        self._res = self.resource_mask.to_numpy()
+
+    def achievements(self, pos):
+        return matching(ACHIEVEMENT_RULES, self._ach[pos])
+
+    def resources(self, pos):
+        return matching(RESOURCE_RULES, self._res[pos])
+
+    def badge_counts(self):
+        """Number of badges per student"""
+        return self.achievement_mask.sum(axis=1)
+
+    def rule_counts(self, kind='achievements'):
+        """Number of students matching each rule"""
+        mask = self.achievement_mask if kind == 'achievements' else self.resource_mask
+        return mask.sum(axis=0)
+
+    def students_with(self, rule_id):
+        """Row positions of students matching `rule_id` (achievement or resource)"""
+        mask = self.achievement_mask if rule_id in self.achievement_mask else self.resource_mask
+        return np.flatnonzero(mask[rule_id].to_numpy())
@@ -0,0 +1,241 @@
+"""
+Input Schema
+The valid range of every numeric student field and the allowed values of
+every categorical one, covering everything generate_advanced_btech_dataset
+produces. validate() checks whole columns with NumPy masks, one pass per
+check, so a million-row batch reports its row-level errors without any
+per-row Python. Missing values are not errors here: training fills them
+with the column mean and scoring with 0, as before. The exception is
+`required` columns, which must hold a value in every row checked for them
+(ingestion requires this of new students).
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_REPORTED_ERRORS = 100
+
+# column: (low, high, whole numbers only); high None = no upper bound
+CGPA = (0.0, 10.0, False)
+PERCENT = (0.0, 100.0, False)
+SCALE_10 = (0.0, 10.0, False)
+COUNT = (0, None, True)
+HOURS_PER_WEEK = (0.0, 168.0, False)
+
+FIELD_RANGES = {
+    **{f'sem{s}_cgpa': CGPA for s in range(1, 9)},
+    **{f'sem{s}_attendance': PERCENT for s in range(1, 9)},
+    **{f'sem{s}_backlogs': COUNT for s in range(1, 9)},
+
+    # Academic
+    'overall_cgpa': CGPA,
+    'overall_attendance': PERCENT,
+    'total_backlogs_history': COUNT,
+    'current_backlogs': COUNT,
+    'assignment_submission_rate': PERCENT,
+    'ontime_submission_rate': PERCENT,
+    'late_submissions_count': COUNT,
+    'quiz_average': PERCENT,
+    'lab_performance': PERCENT,
+    'lab_attendance': PERCENT,
+    'project_score': PERCENT,
+    'class_participation': SCALE_10,
+
+    # Engagement
+    'lms_logins_per_week': COUNT,
+    'lms_time_hours_per_week': HOURS_PER_WEEK,
+    'video_completion_rate': PERCENT,
+    'forum_posts': COUNT,
+    'resource_downloads': COUNT,
+    'study_hours_per_week': HOURS_PER_WEEK,
+    'library_visits_per_week': (0.0, None, False),
+
+    # Activities
+    'internships_completed': COUNT,
+    'internship_rating': (0.0, 5.0, False),
+    'certifications': COUNT,
+    'papers_presented': COUNT,
+    'hackathons_participated': COUNT,
+    'competitions_won': COUNT,
+    'opensource_contributions': COUNT,
+    'technical_blogs': COUNT,
+
+    # Aptitude & skills
+    'quantitative_aptitude': PERCENT,
+    'logical_reasoning': PERCENT,
+    'verbal_ability': PERCENT,
+    'technical_knowledge': PERCENT,
+    'coding_test_score': PERCENT,
+    'communication_skills': SCALE_10,
+    'leadership_score': SCALE_10,
+    'teamwork_score': SCALE_10,
+
+    # Placement readiness
+    'resume_score': SCALE_10,
+    'mock_interview_score': PERCENT,
+    'aptitude_test_attempts': COUNT,
+    'companies_applied': COUNT,
+    'siblings_in_college': COUNT,
+
+    # Targets
+    'package_lpa': (0.0, None, False),
+    'risk_score': PERCENT,
+}
+
+FIELD_VALUES = {
+    'gender': ('Male', 'Female'),
+    'study_group_frequency': ('Never', 'Rarely', 'Sometimes', 'Often'),
+    'peak_study_time': ('Morning', 'Afternoon', 'Evening', 'Night'),
+    'family_income': ('<2L', '2-5L', '5-10L', '10-20L', '>20L'),
+    'parent_education': ('10th or below', '12th', 'Graduate', 'Post-Graduate', 'Professional'),
+    'distance_from_college': ('<5km', '5-15km', '15-30km', '>30km'),
+    'accommodation': ('Hostel', 'Day Scholar', 'PG'),
+    'scholarship': ('Yes', 'No'),
+    'graduation_status': ('Clear', 'At Risk', 'Critical'),
+    'placement_status': ('Placed', 'Not Placed'),
+    'placement_prediction': ('High', 'Medium', 'Low'),
+    'dropout_risk': ('High', 'Medium', 'Low'),
+}
+
+ERROR_COLUMNS = ['row', 'student_id', 'column', 'value', 'error']
+
+
+class SchemaError(ValueError):
+    """Raised by check() when records fail validation; carries the report"""
+
+    def __init__(self, report):
+        super().__init__(f"{report.n_invalid} of {report.n_rows} rows failed validation")
+        self.report = report
+
+
+class ValidationReport:
+    """
+    Result of validate(): `errors` has one row per failed check, with the
+    row's position in the input, its student_id (if any), the column, the
+    offending value and the reason, ordered by row
+    """
+
+    def __init__(self, errors, n_rows):
+        self.errors = errors
+        self.n_rows = n_rows
+
+    @property
+    def ok(self):
+        return self.errors.empty
+
+    @property
+    def invalid_rows(self):
+        return np.unique(self.errors['row'].to_numpy())
+
+    @property
+    def n_invalid(self):
+        return len(self.invalid_rows)
+
+    def valid_mask(self):
+        """Boolean mask over the input rows: True where every check passed"""
+        mask = np.ones(self.n_rows, dtype=bool)
+        mask[self.invalid_rows] = False
+        return mask
+
+    def with_rows(self, positions, report, n_rows=None):
+        """
+        Report with the rows at `positions` revalidated: their old errors are
+        replaced by `report`, the validation of just those rows (in the same
+        order). `n_rows` is the new total when rows were appended.
+        """
+        positions = np.asarray(positions, dtype=int)
+        kept = self.errors[~self.errors['row'].isin(positions)]
+        errors = report.errors.copy()
+        errors['row'] = positions[errors['row'].to_numpy(dtype=int)]
+        parts = [e for e in (kept, errors) if len(e)]
+        if parts:
+            errors = pd.concat(parts, ignore_index=True).sort_values('row', kind='stable').reset_index(drop=True)
+        else:
+            errors = kept
+        return ValidationReport(errors, self.n_rows if n_rows is None else n_rows)
+
+    def summary(self, limit=MAX_REPORTED_ERRORS):
+        """Counts plus the first `limit` errors as plain records"""
+        errors = self.errors.head(limit)
+        return {
+            'rows': self.n_rows,
+            'invalid_rows': self.n_invalid,
+            'errors': len(self.errors),
+            'by_column': self.errors['column'].value_counts().to_dict(),
+            'first_errors': errors.astype(object).where(errors.notna(), None).to_dict(orient='records'),
+        }
+
+
+def _describe(column):
+    if column in FIELD_VALUES:
+        return f"not one of: {', '.join(FIELD_VALUES[column])}"
+    low, high, _ = FIELD_RANGES[column]
+    return f"outside {low:g}-{high:g}" if high is not None else f"below {low:g}"
+
+
+def validate(df, columns=None, required=(), required_rows=None):
+    """
+    Check `columns` of `df` (default: every column the schema knows)
+    against FIELD_RANGES and FIELD_VALUES. Unknown columns are ignored.
+    `required` columns must also be present with a value in the rows
+    selected by the boolean mask `required_rows` (default: every row).
+    """
+    columns = [c for c in (df.columns if columns is None else columns)
+               if c in df.columns and (c in FIELD_RANGES or c in FIELD_VALUES)]
+    rows, values, names, reasons = [], [], [], []
+
+    def fail(mask, series, reason):
+        bad = np.flatnonzero(mask)
+        if len(bad):
+            rows.append(bad)
+            values.append(series.iloc[bad].to_numpy(dtype=object))
+            names.append(np.full(len(bad), series.name, dtype=object))
+            reasons.append(np.full(len(bad), reason, dtype=object))
+
+    if len(required):
+        selected = np.ones(len(df), dtype=bool) if required_rows is None else np.asarray(required_rows, dtype=bool)
+        for column in required:
+            series = df[column] if column in df.columns else pd.Series(np.nan, index=df.index, name=column)
+            fail(selected & series.isna().to_numpy(), series, "missing a required value")
+
+    for column in columns:
+        series = df[column]
+        present = series.notna().to_numpy()
+        if column in FIELD_VALUES:
+            fail(present & ~series.isin(FIELD_VALUES[column]).to_numpy(), series, _describe(column))
+            continue
+
+        low, high, integer = FIELD_RANGES[column]
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+        finite = np.isfinite(numbers)
+        fail(present & ~finite, series, "not a finite number")
+        in_range = numbers >= low
+        if high is not None:
+            in_range &= numbers <= high
+        fail(finite & ~in_range, series, _describe(column))
+        if integer:
+            fail(finite & in_range & (numbers != np.round(numbers)), series, "not a whole number")
+
+    if not rows:
+        return ValidationReport(pd.DataFrame(columns=ERROR_COLUMNS), len(df))
+
+    row = np.concatenate(rows)
+    order = np.argsort(row, kind='stable')
+    row = row[order]
+    ids = df['student_id'].to_numpy(dtype=object)[row] if 'student_id' in df.columns else None
+    errors = pd.DataFrame({
+        'row': row,
+        'student_id': ids,
+        'column': np.concatenate(names)[order],
+        'value': np.concatenate(values)[order],
+        'error': np.concatenate(reasons)[order],
+    })
+    return ValidationReport(errors, len(df))
+
+
+def check(df, columns=None, required=(), required_rows=None):
+    """validate(), raising SchemaError if any row fails"""
+    report = validate(df, columns, required, required_rows)
+    if not report.ok:
+        raise SchemaError(report)
+    return report
@@ -0,0 +1,43 @@
+"""
+Cohort Scoring
+Scores the whole cohort with one vectorized call per model
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.trajectory import TREND_FEATURES, trajectory_features
+from core.voting import forest_proba
+
+
+def build_feature_matrix(df, features):
+    """
+    Feature matrix in model order. Trend features are derived from the
+    semester columns when a model was trained with them; any other
+    missing column is filled with 0.
+    """
+    trends = [f for f in features if f in TREND_FEATURES and f not in df.columns]
+    if trends:
+        df = df.join(trajectory_features(df)[trends])
+    return df.reindex(columns=features, fill_value=0).to_numpy(dtype=float)
+
+
+def score_cohort(data, models, voting='exact'):
+    """
+    Predict graduation status, confidence and risk for every student.
+    Returns a DataFrame aligned with `data.index`. `voting` selects the
+    graduation forest's early-exit mode (see core/voting.py).
+    """
+    X = build_feature_matrix(data, models['features'])
+    
+    g_prob = forest_proba(models['grad'], X, voting)
+    g_idx = g_prob.argmax(axis=1)
+    g_pred = models['grad'].classes_[g_idx]
+    risk = models['risk'].predict(X)
+    
+    return pd.DataFrame({
+        'student_id': data['student_id'].values,
+        'grad': models['le_grad'].inverse_transform(g_pred),
+        'grad_conf': g_prob[np.arange(len(X)), g_idx] * 100,
+        'risk': risk,
+    }, index=data.index)
@@ -0,0 +1,253 @@
+"""
+Cohort Segments
+Bitmap indexes over binned numeric and categorical columns, with a small
+query language ("current_backlogs > 2 AND overall_attendance < 70")
+resolved by bitwise operations on packed bitmaps
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+MAX_EXACT_VALUES = 32   # columns with at most this many distinct values get one bin per value
+RANGE_BINS = 16         # quantile bins for higher-cardinality numeric columns
+
+SEGMENT_NUMERIC_EXTRA = ['risk_score', 'total_backlogs_history', 'package_lpa']
+SEGMENT_CATEGORICAL = [
+    'gender', 'graduation_status', 'placement_status', 'placement_prediction', 'dropout_risk',
+    'study_group_frequency', 'peak_study_time', 'family_income', 'parent_education',
+    'distance_from_college', 'accommodation', 'scholarship',
+]
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits):
+    """Number of set bits in a packed bitmap"""
+    return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+
+class SegmentQueryError(ValueError):
+    """Raised for malformed segment queries or unknown columns"""
+
+
+class _ColumnIndex:
+    """
+    Range-encoded bitmaps for one column: le[b] holds rows whose bin is <= b.
+    Bin b covers (edges[b-1], edges[b]]; exact columns have one value per bin.
+    """
+
+    def __init__(self, values, n):
+        self.n = n
+        if values.dtype.kind in 'fiub':
+            values = values.astype(float)
+            valid = ~np.isnan(values)
+        else:
+            valid = ~pd.isna(values)
+            values = np.where(valid, values, '').astype(str)
+        self.kind = values.dtype.kind
+        self.valid = np.packbits(valid)
+
+        distinct = np.unique(values[valid])
+        self.exact = len(distinct) <= MAX_EXACT_VALUES or values.dtype.kind not in 'f'
+        if self.exact:
+            self.edges = distinct
+        else:
+            qs = np.linspace(1 / RANGE_BINS, 1, RANGE_BINS)
+            self.edges = np.unique(np.quantile(values[valid], qs))
+
+        bins = np.searchsorted(self.edges, values, side='left')
+        bins[~valid] = len(self.edges)
+        counts = np.bincount(bins, minlength=len(self.edges) + 1)
+        self.le = []
+        member = np.zeros(n, dtype=bool)
+        if self.exact:
+            for b in range(len(self.edges)):
+                member |= bins == b
+                self.le.append(np.packbits(member))
+        else:
+            # Rows sorted by value are also sorted by bin; kept so a partially
+            # matching bin is resolved by binary search instead of a row scan
+            self.order = np.argsort(values, kind='stable').astype(np.int32)
+            self.sorted_values = values[self.order]
+            self.bin_start = np.concatenate([[0], np.cumsum(counts[:-1])])
+            for b in range(len(self.edges)):
+                member[self.order[self.bin_start[b]:self.bin_start[b] + counts[b]]] = True
+                self.le.append(np.packbits(member))
+
+    def _bins_le(self, b):
+        """Rows in bins 0..b (b may be -1)"""
+        if b < 0:
+            return np.zeros_like(self.valid)
+        return self.le[min(b, len(self.edges) - 1)]
+
+    def _bin(self, b):
+        return self._bins_le(b) & ~self._bins_le(b - 1)
+
+    def _refine(self, b, op, value):
+        """Exact rows of a partially matching range bin"""
+        lo, hi = self.bin_start[b], self.bin_start[b + 1]
+        left = lo + np.searchsorted(self.sorted_values[lo:hi], value, side='left')
+        right = lo + np.searchsorted(self.sorted_values[lo:hi], value, side='right')
+        start, end = {'<': (lo, left), '<=': (lo, right), '==': (left, right)}[op]
+        hit = np.zeros(self.n, dtype=bool)
+        hit[self.order[start:end]] = True
+        return np.packbits(hit)
+
+    def compare(self, op, value):
+        """Packed bitmap of rows where `column op value` holds"""
+        if op not in _OPS:
+            raise SegmentQueryError(f"Unknown operator {op!r}")
+        if op == '!=':
+            return self.valid & ~self.compare('==', value)
+        if op in ('>', '>='):
+            flipped = '<=' if op == '>' else '<'
+            return self.valid & ~self.compare(flipped, value)
+
+        b = int(np.searchsorted(self.edges, value, side='left'))
+        inside = b < len(self.edges)
+        if op == '==':
+            if not inside:
+                return np.zeros_like(self.valid)
+            if self.exact:
+                return self._bin(b) if self.edges[b] == value else np.zeros_like(self.valid)
+            return self._refine(b, op, value)
+
+        # '<' or '<=': bins below b always match; bin b may match partly
+        below = self._bins_le(b - 1)
+        if not inside:
+            return below
+        if self.exact or (op == '<=' and self.edges[b] == value):
+            return below | self._bin(b) if _OPS[op](self.edges[b], value) else below
+        return below | self._refine(b, op, value)
+
+
+_OPS = {
+    '<': np.less, '<=': np.less_equal,
+    '>': np.greater, '>=': np.greater_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+
+_TOKEN = re.compile(r"""\s*(?:(\()|(\))|(<=|>=|==|!=|<|>|=)|'([^']*)'|"([^"]*)"|([^\s()<>=!'"]+))""")
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise SegmentQueryError(f"Cannot parse query near: {text[pos:]!r}")
+        lparen, rparen, op, sq, dq, word = m.groups()
+        if lparen or rparen:
+            tokens.append(('paren', lparen or rparen))
+        elif op:
+            tokens.append(('op', '==' if op == '=' else op))
+        elif sq is not None or dq is not None:
+            tokens.append(('str', sq if sq is not None else dq))
+        elif word.upper() in ('AND', 'OR', 'NOT'):
+            tokens.append(('kw', word.upper()))
+        else:
+            tokens.append(('word', word))
+        pos = m.end()
+    return tokens
+
+
+class BitmapIndex:
+    """Bitmap indexes for a cohort; answers AND/OR/NOT segment queries"""
+
+    def __init__(self, data, numeric_columns, categorical_columns=SEGMENT_CATEGORICAL):
+        self.n = len(data)
+        self.columns = {}
+        for col in list(numeric_columns) + list(categorical_columns):
+            if col in data.columns and col not in self.columns:
+                self.columns[col] = _ColumnIndex(data[col].to_numpy(), self.n)
+        self.all = np.packbits(np.ones(self.n, dtype=bool))
+
+    def describe(self):
+        """(column, kind, bins) for each indexed column"""
+        return [(col, 'exact' if idx.exact else 'range', len(idx.edges))
+                for col, idx in self.columns.items()]
+
+    def query(self, text):
+        """Packed bitmap of rows matching the query"""
+        tokens = _tokenize(text)
+        if not tokens:
+            return self.all.copy()
+        return _Parser(self, tokens).parse()
+
+    def count(self, text):
+        return popcount(self.query(text))
+
+    def rows(self, text):
+        """Row positions matching the query"""
+        return np.flatnonzero(np.unpackbits(self.query(text), count=self.n))
+
+
+class _Parser:
+    """
+    Recursive-descent parser evaluating straight to bitmaps:
+    expr := term (OR term)*, term := factor (AND factor)*,
+    factor := NOT factor | ( expr ) | column op value
+    """
+
+    def __init__(self, index, tokens):
+        self.index = index
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse(self):
+        bits = self._expr()
+        if self.pos != len(self.tokens):
+            raise SegmentQueryError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return bits
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self):
+        tok = self._peek()
+        self.pos += 1
+        return tok
+
+    def _expr(self):
+        bits = self._term()
+        while self._peek() == ('kw', 'OR'):
+            self._take()
+            bits = bits | self._term()
+        return bits
+
+    def _term(self):
+        bits = self._factor()
+        while self._peek() == ('kw', 'AND'):
+            self._take()
+            bits = bits & self._factor()
+        return bits
+
+    def _factor(self):
+        kind, val = self._take()
+        if (kind, val) == ('kw', 'NOT'):
+            return self.index.all & ~self._factor()
+        if (kind, val) == ('paren', '('):
+            bits = self._expr()
+            if self._take() != ('paren', ')'):
+                raise SegmentQueryError("Missing closing parenthesis")
+            return bits
+        if kind != 'word':
+            raise SegmentQueryError(f"Expected a column name, got {val!r}")
+        if val not in self.index.columns:
+            raise SegmentQueryError(f"Column {val!r} is not indexed")
+        op_kind, op = self._take()
+        if op_kind != 'op':
+            raise SegmentQueryError(f"Expected a comparison after {val!r}")
+        value_kind, value = self._take()
+        if value_kind not in ('word', 'str'):
+            raise SegmentQueryError(f"Expected a value after {val} {op}")
+        idx = self.index.columns[val]
+        if idx.kind == 'f':
+            try:
+                value = float(value)
+            except ValueError:
+                raise SegmentQueryError(f"{val} is numeric, got {value!r}")
+        return idx.compare(op, value)
@@ -0,0 +1,288 @@
+"""
+Student Store
+SQLite storage for the cohort with indexes on student_id, risk_score and
+graduation_status, so single-student and filtered lookups read only the
+rows and columns they need. The CSV stays the fallback when no store exists.
+Upserts record the students they changed in a change log, and the latest
+model predictions per student are kept next to the records.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+STORE_FILE = 'data/students.db'
+CSV_FILE = 'data/btech_ece_advanced.csv'
+TABLE = 'students'
+INDEXED_COLUMNS = ['risk_score', 'graduation_status']
+PREDICTION_COLUMNS = ['grad', 'grad_conf', 'risk']
+MAX_PARAMS = 10_000     # ids per IN (...) query, well under SQLite's variable limit
+
+_SIDE_TABLES = """
+    CREATE TABLE IF NOT EXISTS changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id TEXT NOT NULL,
+        changed_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS predictions (
+        student_id TEXT PRIMARY KEY,
+        grad TEXT,
+        grad_conf REAL,
+        risk REAL,
+        scored_at REAL NOT NULL
+    );
+"""
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class StudentStore:
+    """Indexed SQLite table of student records"""
+
+    def __init__(self, path=STORE_FILE):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SIDE_TABLES)
+
+    def close(self):
+        self.conn.close()
+
+    def columns(self):
+        """Column names of the students table (empty if not written yet)"""
+        with self._lock:
+            rows = self.conn.execute(f"PRAGMA table_info({TABLE})").fetchall()
+        return [r[1] for r in rows]
+
+    def _select(self, columns):
+        if columns is None:
+            return '*'
+        known = set(self.columns())
+        unknown = [c for c in columns if c not in known]
+        if unknown:
+            raise KeyError(f"Unknown columns: {unknown}")
+        return ', '.join(_quote(c) for c in columns)
+
+    # ------------------------------------------
+    # Writes
+    # ------------------------------------------
+
+    def write(self, df):
+        """Replace the whole table with `df` and rebuild the indexes"""
+        with self._lock:
+            self.conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            df.to_sql(TABLE, self.conn, index=False, chunksize=10_000)
+            self.conn.execute(f"CREATE UNIQUE INDEX idx_{TABLE}_student_id ON {TABLE}(student_id)")
+            for col in INDEXED_COLUMNS:
+                if col in df.columns:
+                    self.conn.execute(f"CREATE INDEX idx_{TABLE}_{col} ON {TABLE}({_quote(col)})")
+            # A full rewrite starts a new history: readers reload everything
+            self.conn.execute("DELETE FROM changes")
+            self.conn.execute("DELETE FROM predictions")
+            self.conn.commit()
+
+    def upsert(self, df, now=None):
+        """
+        Insert new students and update existing ones. Only the columns present
+        in `df` are written and a missing (NaN) value keeps the stored one, so
+        records may carry different subsets of columns. Rows whose values did
+        not change are skipped; every changed student goes to the change log.
+        Returns (inserted_ids, updated_ids).
+        """
+        if 'student_id' not in df.columns:
+            raise KeyError("Records need a student_id")
+        known = self.columns()
+        unknown = [c for c in df.columns if c not in known]
+        if unknown:
+            raise KeyError(f"Unknown columns: {unknown}")
+        df = df.drop_duplicates('student_id', keep='last')
+        now = now or time.time()
+
+        current = self.students(df['student_id'], list(df.columns)).set_index('student_id')
+        incoming = df.set_index('student_id')
+        exists = incoming.index.isin(current.index)
+        new, old = incoming[~exists], incoming[exists]
+
+        cur = current.reindex(old.index)[old.columns]
+        old = old.where(old.notna(), cur)
+        same = (cur == old) | (cur.isna() & old.isna())
+        for col in old.columns:
+            # Numbers read back from SQLite may differ in dtype only
+            if pd.api.types.is_numeric_dtype(old[col]) and pd.api.types.is_numeric_dtype(cur[col]):
+                same[col] |= np.isclose(cur[col].astype(float), old[col].astype(float), rtol=0, atol=1e-12)
+        changed = old[~same.all(axis=1)]
+
+        def py(values):
+            return [None if pd.isna(v) else v.item() if hasattr(v, 'item') else v for v in values]
+
+        with self._lock:
+            if len(new):
+                cols = ['student_id'] + list(new.columns)
+                self.conn.executemany(
+                    f"INSERT INTO {TABLE} ({', '.join(_quote(c) for c in cols)}) "
+                    f"VALUES ({', '.join('?' * len(cols))})",
+                    [py(row) for row in new.reset_index()[cols].itertuples(index=False)])
+            if len(changed):
+                sets = ', '.join(f"{_quote(c)} = ?" for c in changed.columns)
+                self.conn.executemany(
+                    f"UPDATE {TABLE} SET {sets} WHERE student_id = ?",
+                    [py(row) + [sid] for sid, row in zip(changed.index, changed.itertuples(index=False))])
+            ids = list(new.index) + list(changed.index)
+            self.conn.executemany("INSERT INTO changes (student_id, changed_at) VALUES (?, ?)",
+                                  [(sid, now) for sid in ids])
+            self.conn.commit()
+        return list(new.index), list(changed.index)
+
+    def last_change(self):
+        """Sequence number of the latest change (0 if none)"""
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def changes_since(self, seq):
+        """(student_ids changed after `seq`, latest seq), each id once"""
+        with self._lock:
+            rows = self.conn.execute("SELECT seq, student_id FROM changes WHERE seq > ? ORDER BY seq",
+                                     (seq,)).fetchall()
+        if not rows:
+            return [], seq
+        return list(dict.fromkeys(r[1] for r in rows)), rows[-1][0]
+
+    # ------------------------------------------
+    # Predictions
+    # ------------------------------------------
+
+    def write_predictions(self, predictions, now=None):
+        """Upsert student_id, grad, grad_conf, risk rows"""
+        now = now or time.time()
+        rows = predictions[['student_id'] + PREDICTION_COLUMNS].itertuples(index=False)
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO predictions (student_id, grad, grad_conf, risk, scored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(sid, str(g), float(c), float(r), now) for sid, g, c, r in rows])
+            self.conn.commit()
+
+    def read_predictions(self, ids=None):
+        """Stored predictions, for all students or the given ids"""
+        cols = ', '.join(['student_id'] + PREDICTION_COLUMNS + ['scored_at'])
+        if ids is None:
+            return self._query(f"SELECT {cols} FROM predictions")
+        ids = list(ids)
+        if not ids:
+            return pd.DataFrame(columns=['student_id'] + PREDICTION_COLUMNS + ['scored_at'])
+        parts = []
+        for start in range(0, len(ids), MAX_PARAMS):
+            chunk = ids[start:start + MAX_PARAMS]
+            marks = ', '.join('?' * len(chunk))
+            parts.append(self._query(f"SELECT {cols} FROM predictions WHERE student_id IN ({marks})", chunk))
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    # ------------------------------------------
+    # Reads
+    # ------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def read(self, columns=None):
+        """The whole table, optionally only some columns, in insertion order"""
+        return self._query(f"SELECT {self._select(columns)} FROM {TABLE} ORDER BY rowid")
+
+    def student(self, student_id, columns=None):
+        """One student's record as a Series, or None (uses the student_id index)"""
+        rows = self._query(f"SELECT {self._select(columns)} FROM {TABLE} WHERE student_id = ?", (student_id,))
+        return rows.iloc[0] if len(rows) else None
+
+    def students(self, ids, columns=None):
+        """Records for a list of student_ids (unknown ids are skipped)"""
+        ids = list(ids)
+        if not ids:
+            return pd.DataFrame(columns=columns or self.columns())
+        select = self._select(columns)
+        parts = []
+        for start in range(0, len(ids), MAX_PARAMS):
+            chunk = ids[start:start + MAX_PARAMS]
+            marks = ', '.join('?' * len(chunk))
+            parts.append(self._query(f"SELECT {select} FROM {TABLE} WHERE student_id IN ({marks})", chunk))
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    def filter(self, status=None, min_risk=None, max_risk=None, columns=None, limit=None):
+        """
+        Students by graduation_status and/or risk_score range (both indexed),
+        highest risk first
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("graduation_status = ?")
+            params.append(status)
+        if min_risk is not None:
+            clauses.append("risk_score >= ?")
+            params.append(min_risk)
+        if max_risk is not None:
+            clauses.append("risk_score <= ?")
+            params.append(max_risk)
+        sql = f"SELECT {self._select(columns)} FROM {TABLE}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY risk_score DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._query(sql, params)
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+
+def store_exists(base='.'):
+    """True once the store holds the students table; checked read-only, so it never writes"""
+    path = os.path.join(base, STORE_FILE)
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE,)).fetchone()
+        return row is not None
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+
+def data_source(base='.'):
+    """Path the cohort is read from: the SQLite store if present, else the CSV"""
+    return os.path.join(base, STORE_FILE if store_exists(base) else CSV_FILE)
+
+
+def load_students(base='.', columns=None):
+    """Cohort from the store when present, otherwise from the CSV"""
+    if store_exists(base):
+        store = StudentStore(os.path.join(base, STORE_FILE))
+        try:
+            return store.read(columns)
+        finally:
+            store.close()
+    return pd.read_csv(os.path.join(base, CSV_FILE), usecols=columns)
+
+
+def save_students(df, base='.'):
+    """Write the cohort to both the CSV and the indexed store"""
+    os.makedirs(os.path.join(base, 'data'), exist_ok=True)
+    df.to_csv(os.path.join(base, CSV_FILE), index=False)
+    store = StudentStore(os.path.join(base, STORE_FILE))
+    try:
+        store.write(df)
+    finally:
+        store.close()
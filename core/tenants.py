@@ -0,0 +1,308 @@
+"""
+Tenants
+Each department or campus is a tenant with its own model set and dataset.
+The default tenant is the repository root (models/, data/); any other
+tenant lives under tenants/<tenant_id>/ with the same layout, so the phase
+1 and phase 2 scripts can be run from that directory to create one.
+Loaded tenants are kept in an LRU cache bounded by estimated memory, and
+their models can be unpickled lazily, file by file, on first use. Scores
+and indexes built from a tenant live in its DerivedCache, inside the same
+cache entry, so evicting a tenant frees them too.
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TENANT = 'default'
+TENANTS_DIR = 'tenants'
+TENANT_CACHE_MB = 1024
+SIZE_SAMPLE = 1000   # deep_nbytes measures this many items of a longer list and scales up
+
+_TENANT_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+
+class UnknownTenant(KeyError):
+    """Raised for malformed tenant ids or tenants without a models/ directory"""
+
+
+def load_models(base, model_files):
+    """Unpickle every model file (paths relative to the tenant directory)"""
+    models = {}
+    for key, path in model_files.items():
+        with open(os.path.join(base, path), 'rb') as f:
+            models[key] = pickle.load(f)
+    return models
+
+
+class LazyModels(Mapping):
+    """
+    Model files unpickled on first access, one file at a time, so a page
+    only pays for the models it actually uses. `on_load(key, seconds)` is
+    called after each load.
+    """
+
+    def __init__(self, base, model_files, on_load=None):
+        self.base = base
+        self.files = dict(model_files)
+        self.on_load = on_load
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        if key not in self._models:
+            path = os.path.join(self.base, self.files[key])
+            with self._lock:
+                if key not in self._models:
+                    start = time.perf_counter()
+                    with open(path, 'rb') as f:
+                        self._models[key] = pickle.load(f)
+                    if self.on_load is not None:
+                        self.on_load(key, time.perf_counter() - start)
+        return self._models[key]
+
+    def __contains__(self, key):
+        # Membership must not trigger a load
+        return key in self.files
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def loaded(self):
+        """Keys of the models unpickled so far"""
+        return list(self._models)
+
+
+def estimate_nbytes(data, model_paths):
+    """
+    Rough resident size of a loaded tenant: the frame's deep memory usage
+    plus the model pickles' on-disk size (tree arrays dominate both)
+    """
+    size = int(data.memory_usage(deep=True).sum())
+    return size + sum(os.path.getsize(p) for p in model_paths if os.path.exists(p))
+
+
+def deep_nbytes(obj, exclude=()):
+    """
+    Rough resident size of an object graph: arrays and frames by their
+    buffers, containers and plain objects by walking their contents.
+    Objects in `exclude` (and functions, classes, modules) count as zero;
+    each object is counted once.
+    """
+    seen = {id(o) for o in exclude}
+    stack, size = [(obj, 1)], 0.0
+    while stack:
+        item, weight = stack.pop()
+        if id(item) in seen or isinstance(item, (type, types.FunctionType, types.MethodType, types.ModuleType)):
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            size += weight * item.nbytes
+        elif isinstance(item, (pd.DataFrame, pd.Series, pd.Index)):
+            size += weight * int(np.sum(item.memory_usage(deep=True)))
+        elif isinstance(item, dict):
+            size += weight * sys.getsizeof(item)
+            stack.extend((k, weight) for k in item.keys())
+            stack.extend((v, weight) for v in item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            size += weight * sys.getsizeof(item)
+            items = list(item)
+            if len(items) > SIZE_SAMPLE:
+                sample = items[::len(items) // SIZE_SAMPLE][:SIZE_SAMPLE]
+                stack.extend((i, weight * len(items) / len(sample)) for i in sample)
+            else:
+                stack.extend((i, weight) for i in items)
+        else:
+            size += weight * sys.getsizeof(item)
+            if hasattr(item, '__dict__'):
+                stack.append((vars(item), weight))
+    return int(size)
+
+
+class DerivedCache:
+    """
+    Everything built from one loaded tenant (scores, indexes, explanations),
+    stored in the tenant's registry entry so it is dropped with the tenant.
+    get(name, key, build) keeps the `limit` most recent keys per name.
+    `shared()` returns the objects already counted by the tenant's own size
+    (its frame and models); `on_resize(nbytes)` is called with the new total
+    after every build or remeasure.
+    """
+
+    def __init__(self, shared=None, on_resize=None):
+        self.shared = shared
+        self.on_resize = on_resize
+        self.entries = {}                # name -> OrderedDict(key -> value)
+        self.sizes = {}                  # (name, key) -> nbytes
+        self._lock = threading.Lock()
+        self._building = {}              # name -> lock, so each name builds once at a time
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(self.sizes.values())
+
+    def get(self, name, key, build, limit=1):
+        """Value for (name, key), building it on a miss"""
+        with self._lock:
+            entries = self.entries.setdefault(name, OrderedDict())
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key]
+            build_lock = self._building.setdefault(name, threading.Lock())
+        with build_lock:
+            with self._lock:
+                if key in entries:
+                    return entries[key]
+            value = build()
+            size = self._measure(value)
+            with self._lock:
+                entries[key] = value
+                self.sizes[(name, key)] = size
+                while len(entries) > limit:
+                    old, _ = entries.popitem(last=False)
+                    self.sizes.pop((name, old), None)
+        self._resized()
+        return value
+
+    def remeasure(self, name):
+        """Measure `name` again after its values changed in place"""
+        with self._lock:
+            values = dict(self.entries.get(name, {}))
+        for key, value in values.items():
+            size = self._measure(value)
+            with self._lock:
+                if (name, key) in self.sizes:
+                    self.sizes[(name, key)] = size
+        self._resized()
+
+    def _measure(self, value):
+        return deep_nbytes(value, self.shared() if self.shared is not None else ())
+
+    def _resized(self):
+        if self.on_resize is not None:
+            self.on_resize(self.nbytes)
+
+
+class TenantRegistry:
+    """
+    Resolves tenant directories and keeps loaded tenants in an LRU cache.
+    `loader(tenant_id, base_dir)` returns (value, nbytes); the least recently
+    used tenants are evicted once the total exceeds `max_bytes`. A tenant
+    whose value grows after loading reports its new size through resize().
+    """
+
+    def __init__(self, loader, root='.', max_bytes=TENANT_CACHE_MB * 1024**2):
+        self.loader = loader
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()     # tenant_id -> (value, nbytes)
+        self.bytes = 0
+        self.metrics = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0}
+        self._lock = threading.Lock()
+        self._loading = {}               # tenant_id -> lock, so a tenant is loaded once
+
+    def base_dir(self, tenant_id):
+        """Directory holding a tenant's models/ and data/"""
+        if tenant_id == DEFAULT_TENANT:
+            return self.root
+        if not _TENANT_ID.match(tenant_id or ''):
+            raise UnknownTenant(tenant_id)
+        base = os.path.join(self.root, TENANTS_DIR, tenant_id)
+        if not os.path.isdir(os.path.join(base, 'models')):
+            raise UnknownTenant(tenant_id)
+        return base
+
+    def tenant_ids(self):
+        """The default tenant followed by every tenants/<id>/ with a models/ directory"""
+        ids = [DEFAULT_TENANT]
+        tenants_root = os.path.join(self.root, TENANTS_DIR)
+        if os.path.isdir(tenants_root):
+            ids += sorted(t for t in os.listdir(tenants_root)
+                          if _TENANT_ID.match(t) and os.path.isdir(os.path.join(tenants_root, t, 'models')))
+        return ids
+
+    def get(self, tenant_id):
+        """Loaded tenant, from the cache or loaded on demand"""
+        with self._lock:
+            if tenant_id in self.entries:
+                self.entries.move_to_end(tenant_id)
+                self.metrics['hits'] += 1
+                return self.entries[tenant_id][0]
+        base = self.base_dir(tenant_id)
+
+        with self._lock:
+            self.metrics['misses'] += 1
+            load_lock = self._loading.setdefault(tenant_id, threading.Lock())
+        with load_lock:
+            with self._lock:
+                # Another thread may have finished loading while we waited
+                if tenant_id in self.entries:
+                    self.entries.move_to_end(tenant_id)
+                    return self.entries[tenant_id][0]
+            try:
+                start = time.perf_counter()
+                value, nbytes = self.loader(tenant_id, base)
+                elapsed = time.perf_counter() - start
+            finally:
+                with self._lock:
+                    self._loading.pop(tenant_id, None)
+
+            with self._lock:
+                self.metrics['load_seconds'] += elapsed
+                self.entries[tenant_id] = (value, nbytes)
+                self.bytes += nbytes
+                self._evict()
+            return value
+
+    def _evict(self):
+        # The most recent tenant always stays, even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, nbytes) = self.entries.popitem(last=False)
+            self.bytes -= nbytes
+            self.metrics['evictions'] += 1
+
+    def resize(self, tenant_id, nbytes):
+        """
+        Record a loaded tenant's new size, evicting others if it no longer fits.
+        The tenant is in use while it grows, so it becomes the most recent
+        entry and is never the one evicted.
+        """
+        with self._lock:
+            if tenant_id not in self.entries:
+                return
+            value, old = self.entries[tenant_id]
+            self.entries[tenant_id] = (value, nbytes)
+            self.entries.move_to_end(tenant_id)
+            self.bytes += nbytes - old
+            self._evict()
+
+    def invalidate(self, tenant_id):
+        """Drop a tenant so the next get() reloads it from disk"""
+        with self._lock:
+            entry = self.entries.pop(tenant_id, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.metrics['hits'] + self.metrics['misses']
+            return {
+                **self.metrics,
+                'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+                'loaded': list(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+            }
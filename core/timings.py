@@ -0,0 +1,49 @@
+"""
+Startup Timings
+Wall-clock timings of the app's phases (imports, model and data loads,
+resource builds and page renders), kept for the life of the server
+process so cold-start and warm runs can be compared in the debug panel
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
+
+import pandas as pd
+
+MAX_TIMINGS = 2000
+
+
+class Timings:
+    """Bounded log of (phase, page, seconds) measurements"""
+
+    def __init__(self, maxlen=MAX_TIMINGS):
+        self.records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, phase, seconds, page=None):
+        with self._lock:
+            self.records.append({'phase': phase, 'page': page or '-', 'seconds': seconds, 'at': time.time()})
+
+    @contextmanager
+    def measure(self, phase, page=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, page)
+
+    def summary(self):
+        """Per (phase, page): count, first (cold) and last run and the mean, in milliseconds"""
+        with self._lock:
+            frame = pd.DataFrame(list(self.records), columns=['phase', 'page', 'seconds', 'at'])
+        if frame.empty:
+            return pd.DataFrame(columns=['phase', 'page', 'runs', 'first_ms', 'last_ms', 'mean_ms'])
+        ms = frame.assign(ms=frame['seconds'] * 1000).groupby(['phase', 'page'], sort=False)['ms']
+        return pd.DataFrame({
+            'runs': ms.size(),
+            'first_ms': ms.first(),
+            'last_ms': ms.last(),
+            'mean_ms': ms.mean(),
+        }).reset_index()
@@ -0,0 +1,88 @@
+"""
+Semester Trajectories
+Reshapes sem1..sem8 columns into (n_students x 8) arrays and derives
+trend features for the whole cohort in vectorized form
+"""
+
+import numpy as np
+import pandas as pd
+
+N_SEMESTERS = 8
+SEMESTER_LABELS = [f"Sem {i}\n({'Jan-Jun' if i % 2 else 'Jul-Dec'})" for i in range(1, N_SEMESTERS + 1)]
+RECENT_K = [2, 4]
+
+TREND_FEATURES = (
+    ['cgpa_slope', 'cgpa_volatility'] + [f'cgpa_delta_last{k}' for k in RECENT_K] +
+    ['cgpa_improving_streak', 'cgpa_declining_streak'] +
+    ['attendance_slope', 'attendance_volatility'] + [f'attendance_delta_last{k}' for k in RECENT_K] +
+    ['backlog_free_streak', 'backlogs_last2']
+)
+
+
+def semester_matrix(df, metric):
+    """(n_students x 8) float array of sem{i}_{metric} columns"""
+    cols = [f'sem{i}_{metric}' for i in range(1, N_SEMESTERS + 1)]
+    return df[cols].to_numpy(dtype=float)
+
+
+def slope(M):
+    """Least-squares slope per row (change per semester)"""
+    x = np.arange(M.shape[1], dtype=float)
+    x -= x.mean()
+    return (M - M.mean(axis=1, keepdims=True)) @ x / (x @ x)
+
+
+def volatility(M):
+    """Standard deviation of semester-to-semester changes"""
+    return np.diff(M, axis=1).std(axis=1)
+
+
+def trailing_streak(cond):
+    """Number of consecutive True values at the end of each row"""
+    return np.cumprod(cond[:, ::-1], axis=1).sum(axis=1)
+
+
+def trajectory_features(df):
+    """All TREND_FEATURES for every row of `df`, aligned with its index"""
+    cgpa = semester_matrix(df, 'cgpa')
+    att = semester_matrix(df, 'attendance')
+    backs = semester_matrix(df, 'backlogs')
+    cgpa_diff = np.diff(cgpa, axis=1)
+
+    feats = {'cgpa_slope': slope(cgpa), 'cgpa_volatility': volatility(cgpa)}
+    for k in RECENT_K:
+        feats[f'cgpa_delta_last{k}'] = cgpa[:, -1] - cgpa[:, -1 - k]
+    feats['cgpa_improving_streak'] = trailing_streak(cgpa_diff > 0)
+    feats['cgpa_declining_streak'] = trailing_streak(cgpa_diff < 0)
+
+    feats['attendance_slope'] = slope(att)
+    feats['attendance_volatility'] = volatility(att)
+    for k in RECENT_K:
+        feats[f'attendance_delta_last{k}'] = att[:, -1] - att[:, -1 - k]
+
+    feats['backlog_free_streak'] = trailing_streak(backs == 0)
+    feats['backlogs_last2'] = backs[:, -2:].sum(axis=1)
+
+    return pd.DataFrame(feats, index=df.index)[TREND_FEATURES]
+
+
+class Trajectories:
+    """Cached semester arrays and trend features for a cohort"""
+
+    def __init__(self, data):
+        self.cgpa = semester_matrix(data, 'cgpa')
+        self.attendance = semester_matrix(data, 'attendance')
+        self.backlogs = semester_matrix(data, 'backlogs')
+        self.features = trajectory_features(data)
+
+    def progress(self, pos):
+        """Semester-wise table for the student at row position `pos`"""
+        return pd.DataFrame({
+            'Semester': SEMESTER_LABELS,
+            'CGPA': self.cgpa[pos],
+            'Attendance': self.attendance[pos],
+            'Backlogs': self.backlogs[pos].astype(int),
+        })
+
+    def trends(self, pos):
+        return self.features.iloc[pos]
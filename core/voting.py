@@ -0,0 +1,92 @@
+"""
+Early-Exit Voting
+Evaluates a random forest classifier's trees in chunks and stops, per row,
+once further trees cannot matter. Rows that exit early keep the mean
+probabilities of the trees evaluated so far.
+
+Modes:
+- 'exact': every tree, the same probabilities as predict_proba
+- 'safe': stop once the leading class can no longer be overtaken, since each
+  remaining tree adds at most 1 to any class; labels match predict()
+- 'confident': also stop once the running confidence reaches `threshold`
+"""
+
+import weakref
+
+import numpy as np
+
+from core.forest import leaf_values
+
+VOTE_CHUNK = 20
+CONFIDENCE_EXIT = 0.9
+VOTING_MODES = ('exact', 'safe', 'confident')
+
+_MARGIN_EPS = 1e-9      # summation order differs from scikit-learn's; keep a hair of slack
+
+
+class EarlyExitForest:
+    """Chunked tree evaluation for a fitted RandomForestClassifier"""
+
+    def __init__(self, model, chunk=VOTE_CHUNK):
+        self.classes_ = model.classes_
+        self.trees = [est.tree_ for est in model.estimators_]
+        self.values = [leaf_values(tree, True) for tree in self.trees]
+        self.chunk = chunk
+
+    @property
+    def n_trees(self):
+        return len(self.trees)
+
+    def predict_proba(self, X, mode='safe', threshold=CONFIDENCE_EXIT):
+        """(probabilities, trees evaluated per row)"""
+        if mode not in VOTING_MODES:
+            raise ValueError(f"Unknown voting mode: {mode} (expected one of {', '.join(VOTING_MODES)})")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, n_trees = len(X), self.n_trees
+        totals = np.zeros((n, len(self.classes_)))
+        used = np.full(n, n_trees, dtype=np.int32)
+        active = np.arange(n)
+
+        for start in range(0, n_trees, self.chunk):
+            end = min(start + self.chunk, n_trees)
+            rows = X[active]
+            part = np.zeros((len(active), len(self.classes_)))
+            leaf = np.empty_like(part)
+            for t in range(start, end):
+                part += np.take(self.values[t], self.trees[t].apply(rows), axis=0, out=leaf)
+            totals[active] += part
+            if mode == 'exact' or end == n_trees:
+                continue
+
+            top2 = np.partition(totals[active], -2, axis=1)[:, -2:]
+            done = top2[:, 1] - top2[:, 0] > (n_trees - end) + _MARGIN_EPS
+            if mode == 'confident':
+                done |= top2[:, 1] / end >= threshold
+            used[active[done]] = end
+            active = active[~done]
+            if not len(active):
+                break
+
+        return totals / used[:, None], used
+
+    def predict(self, X, mode='safe', threshold=CONFIDENCE_EXIT):
+        proba, _ = self.predict_proba(X, mode, threshold)
+        return self.classes_[proba.argmax(axis=1)]
+
+
+_forests = weakref.WeakKeyDictionary()
+
+
+def early_exit_forest(model):
+    """EarlyExitForest for `model`, built once per fitted model object"""
+    forest = _forests.get(model)
+    if forest is None:
+        forest = _forests[model] = EarlyExitForest(model)
+    return forest
+
+
+def forest_proba(model, X, voting='exact', threshold=CONFIDENCE_EXIT):
+    """Class probabilities through predict_proba ('exact') or early-exit voting"""
+    if voting == 'exact':
+        return model.predict_proba(X)
+    return early_exit_forest(model).predict_proba(X, voting, threshold)[0]
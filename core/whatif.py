@@ -0,0 +1,101 @@
+"""
+What-If Simulator
+Incremental forest inference: each tree's decision path for a base student
+is cached, and a what-if change only re-walks the trees whose cached path
+tests a changed feature (starting from the first such node)
+"""
+
+import numpy as np
+
+from core.forest import LEAF, is_classifier, leaf_values, tree_input
+
+
+class IncrementalForest:
+    """Forest with cached per-tree decision paths for one base row"""
+    
+    def __init__(self, model, x):
+        self.classifier = is_classifier(model)
+        self.classes_ = getattr(model, 'classes_', None)
+        self.n_trees = len(model.estimators_)
+        self.base_x = tree_input(x)
+        base = self.base_x.tolist()
+        
+        self.trees = []
+        self.paths = []
+        self.uses = np.zeros((self.n_trees, len(self.base_x)), dtype=bool)
+        base_values = []
+        for t, est in enumerate(model.estimators_):
+            tree = est.tree_
+            arrays = (tree.children_left.tolist(), tree.children_right.tolist(),
+                      tree.feature.tolist(), tree.threshold.tolist(), leaf_values(tree, self.classifier))
+            self.trees.append(arrays)
+            path = self._walk(arrays, 0, base)
+            self.paths.append(path)
+            self.uses[t, [arrays[2][node] for node in path[:-1]]] = True
+            base_values.append(arrays[4][path[-1]])
+        
+        self.base_values = np.array(base_values)
+        self.base_total = self.base_values.sum(axis=0)
+    
+    @staticmethod
+    def _walk(arrays, node, x):
+        left, right, feature, threshold, _ = arrays
+        path = [node]
+        while left[node] != LEAF:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+            path.append(node)
+        return path
+    
+    def predict(self, x):
+        """
+        Forest output for `x` (probabilities or value) and the number of
+        trees that had to be re-walked
+        """
+        x = tree_input(x)
+        changed = np.flatnonzero(x != self.base_x)
+        if len(changed) == 0:
+            return self.base_total / self.n_trees, 0
+        
+        affected = np.flatnonzero(self.uses[:, changed].any(axis=1))
+        total = self.base_total - self.base_values[affected].sum(axis=0)
+        changed = set(changed.tolist())
+        x = x.tolist()
+        for t in affected:
+            arrays, path = self.trees[t], self.paths[t]
+            # Nodes before the first changed split route exactly as for the base row
+            start = next(node for node in path if arrays[2][node] in changed)
+            total = total + arrays[4][self._walk(arrays, start, x)[-1]]
+        return total / self.n_trees, len(affected)
+
+
+class WhatIfSimulator:
+    """Graduation, risk and placement what-if predictions for one base student"""
+    
+    def __init__(self, models, x):
+        self.features = list(models['features'])
+        self.base_x = np.asarray(x, dtype=float)
+        self.le = {'grad': models['le_grad'], 'place': models.get('le_place')}
+        self.forests = {key: IncrementalForest(models[key], self.base_x)
+                        for key in ('grad', 'risk', 'place') if key in models}
+    
+    @property
+    def total_trees(self):
+        return sum(f.n_trees for f in self.forests.values())
+    
+    def simulate(self, changes):
+        """Predictions with `changes` ({feature: value}) applied to the base student"""
+        x = self.base_x.copy()
+        for feature, value in changes.items():
+            x[self.features.index(feature)] = value
+        
+        result = {'trees_evaluated': 0}
+        for key, forest in self.forests.items():
+            out, walked = forest.predict(x)
+            result['trees_evaluated'] += walked
+            if forest.classifier:
+                idx = int(np.argmax(out))
+                result[key] = self.le[key].inverse_transform([forest.classes_[idx]])[0]
+                result[f'{key}_conf'] = float(out[idx]) * 100
+            else:
+                result[key] = float(out)
+        return result
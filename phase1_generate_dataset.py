@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 import os
 
+from core.store import save_students, CSV_FILE, STORE_FILE
+
 def generate_advanced_btech_dataset(n_students=300):
     """
     Generate comprehensive B.Tech ECE dataset with 50+ features
@@ -464,9 +466,8 @@ if __name__ == "__main__":
     # Generate dataset
     df = generate_advanced_btech_dataset(n_students=300)
     
-    # Save
-    os.makedirs('data', exist_ok=True)
-    df.to_csv('data/btech_ece_advanced.csv', index=False)
+    # Save (CSV plus the indexed SQLite store the app and API read from)
+    save_students(df)
     
     print("\n" + "="*70)
     print("✅ DATASET GENERATION COMPLETE!")
@@ -475,7 +476,8 @@ if __name__ == "__main__":
     print(f"\n📊 Dataset Statistics:")
     print(f"   Total Students: {len(df)}")
     print(f"   Total Features: {len(df.columns)}")
-    print(f"   File Size: {os.path.getsize('data/btech_ece_advanced.csv') / 1024:.1f} KB")
+    print(f"   File Size: {os.path.getsize(CSV_FILE) / 1024:.1f} KB (CSV), "
+          f"{os.path.getsize(STORE_FILE) / 1024:.1f} KB (SQLite)")
     
     print(f"\n🎓 Graduation Status:")
     print(df['graduation_status'].value_counts())
@@ -494,7 +496,7 @@ if __name__ == "__main__":
     print(df[['student_id', 'overall_cgpa', 'risk_score', 'graduation_status', 'placement_status']].head(5))
     
     print("\n" + "="*70)
-    print("✅ SAVED TO: data/btech_ece_advanced.csv")
+    print(f"✅ SAVED TO: {CSV_FILE} and {STORE_FILE}")
     print("="*70)
     print("\n🚀 NEXT STEP: Run Phase 2 - Deep Learning Model Training")
     print("   Command: python phase2_deep_learning.py")
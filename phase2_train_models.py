@@ -14,6 +14,15 @@ from sklearn.metrics import accuracy_score, classification_report, mean_absolute
 import warnings
 warnings.filterwarnings('ignore')
 
+from core.trajectory import TREND_FEATURES, trajectory_features
+from core.store import StudentStore, load_students, store_exists, data_source, STORE_FILE
+from core.clusters import CohortClusters, cluster_profiles, save_clusters, N_CLUSTERS
+from core.compact import CompactForest, export_compact, forest_nbytes
+from core.schema import validate
+
+# Set USE_TREND_FEATURES=1 to train on semester trend features as well
+USE_TREND_FEATURES = os.environ.get('USE_TREND_FEATURES', '0') == '1'
+
 # Try to import TensorFlow, if not available use scikit-learn only
 try:
     import tensorflow as tf
@@ -141,6 +150,30 @@ class TraditionalMLModels:
         self.models['package'] = model
         return model, r2
 
+# ==========================================
+# COHORT CLUSTERING
+# ==========================================
+
+def build_clusters(df, X, feature_columns, n_clusters=N_CLUSTERS):
+    """Fit mini-batch k-means on the model features and save centroids, assignments and profiles"""
+    
+    print(f"\n🧩 Clustering students into {n_clusters} segments...")
+    
+    clusters = CohortClusters(feature_columns, n_clusters=n_clusters).fit(X)
+    labels, distances = clusters.predict(X)
+    assignments = pd.DataFrame({
+        'student_id': df['student_id'].values,
+        'cluster': labels,
+        'distance': distances,
+    })
+    profiles = cluster_profiles(df, labels, clusters)
+    save_clusters(clusters, assignments, profiles)
+    
+    for c, row in profiles.iterrows():
+        print(f"   Cluster {c}: {int(row['students']):5d} students  ({row['label']})")
+    print("✅ Saved: cluster_model.pkl, cluster_assignments.pkl, cluster_profiles.pkl")
+    return clusters
+
 # ==========================================
 # MAIN TRAINING PIPELINE
 # ==========================================
@@ -155,8 +188,19 @@ def main():
     
     # Load data
     print("\n📊 Loading dataset...")
-    df = pd.read_csv('data/btech_ece_advanced.csv')
-    print(f"✅ Loaded {len(df)} students with {len(df.columns)} features")
+    df = load_students()
+    print(f"✅ Loaded {len(df)} students with {len(df.columns)} features from {data_source()}")
+    if not store_exists():
+        StudentStore().write(df)
+        print(f"✅ Created indexed store: {STORE_FILE}")
+    
+    # Out-of-range or malformed values would otherwise be trained on as-is
+    report = validate(df)
+    if not report.ok:
+        print(f"⚠️  {report.n_invalid} students with invalid values excluded from training:")
+        for column, count in report.errors['column'].value_counts().items():
+            print(f"   - {column}: {count}")
+        df = df[report.valid_mask()].reset_index(drop=True)
     
     # ==========================================
     # FEATURE SELECTION
@@ -192,9 +236,16 @@ def main():
         'coding_test_score', 'communication_skills'
     ]
     
+    # Semester trend features (slope, volatility, recent deltas, streaks)
+    trend_features = list(TREND_FEATURES)
+    df = df.join(trajectory_features(df))
+    
     # All features (excluding demographics for ethical AI)
     feature_columns = (academic_features + engagement_features + 
                       activity_features + aptitude_features)
+    if USE_TREND_FEATURES:
+        feature_columns += trend_features
+        print(f"✅ Added {len(trend_features)} semester trend features")
     
     print(f"✅ Selected {len(feature_columns)} features (Ethical AI - no demographics)")
     
@@ -303,6 +354,14 @@ def main():
             pickle.dump(pkg_model, f)
         print("✅ Saved: package_model.pkl")
     
+    # Compact float32/int16 copies for memory-constrained serving (COMPACT_MODELS=1 in the API)
+    forests = {'grad': grad_model, 'risk': risk_model, 'place': place_model}
+    if pkg_model:
+        forests['package'] = pkg_model
+    for key, path in export_compact(forests).items():
+        compact = CompactForest.load(path)
+        print(f"✅ Saved: {path} ({forest_nbytes(forests[key]) / 1024:,.0f} KB -> {compact.nbytes / 1024:,.0f} KB)")
+    
     # Save encoders
     with open('models/le_graduation.pkl', 'wb') as f:
         pickle.dump(le_graduation, f)
@@ -317,6 +376,9 @@ def main():
         pickle.dump(feature_columns, f)
     print("✅ Saved: feature_names.pkl")
     
+    # Cohort segments for the dashboard
+    build_clusters(df, X.to_numpy(dtype=float), feature_columns)
+    
     # ==========================================
     # FEATURE IMPORTANCE
     # ==========================================
@@ -353,6 +415,7 @@ def main():
     print(f"   - risk_model.pkl")
     if pkg_model:
         print(f"   - package_model.pkl")
+    print(f"   - cluster_model.pkl, cluster_assignments.pkl, cluster_profiles.pkl")
     
     print("\n🚀 NEXT STEP: Run Phase 3 - Advanced Streamlit App")
     print("   Command: streamlit run phase3_advanced_app.py")